@@ -1,11 +1,19 @@
 import pandas as pd
-import string
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from preprocessing import Preprocessor
 # New import for sentiment analysis
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from preprocessing import preprocess_text
+from sentiment import SentimentEngine
+from result_store import ResultStore
+from corpus_store import convert_csv
+from keyword_index import build_index
+from similarity_index import build_similarity_index
+from aggregates import build_aggregates
+from instrumentation import metrics
+
+_sentiment_engine = None
+
 
 def analyze_sentiment(text):
     """
@@ -13,43 +21,195 @@ def analyze_sentiment(text):
     Returns the compound score, which is a single normalized score.
     -1 (most negative) to +1 (most positive).
     """
-    analyzer = SentimentIntensityAnalyzer()
-    sentiment_score = analyzer.polarity_scores(text)
-    return sentiment_score['compound']
+    global _sentiment_engine
+    if _sentiment_engine is None:
+        _sentiment_engine = SentimentEngine()
+    return _sentiment_engine.score(text)
 
 
-if __name__ == '__main__':
+def print_extremes(most_positive, most_negative):
+    print("\nMost Positive Speech:")
+    print(
+        f"  President: {most_positive['president']}, Date: {most_positive['date']}, Score: {most_positive['sentiment_score']:.2f}")
+
+    print("\nMost Negative Speech:")
+    print(
+        f"  President: {most_negative['president']}, Date: {most_negative['date']}, Score: {most_negative['sentiment_score']:.2f}")
+
+
+def preprocess_texts(texts, preprocessor, store, workers, executor):
+    """Preprocesses texts, taking unchanged ones from the result store when there is one."""
+    def compute(batch):
+        metrics.count('preprocess_computed', len(batch))
+        return preprocessor.process_batch(batch, workers=workers, executor=executor)
+    with metrics.stage('preprocess', items=len(texts)):
+        if store is None:
+            return compute(list(texts))
+        return store.map('preprocess', preprocessor.version, texts, compute)
+
+
+def analyze_texts(texts, sentiment_engine, store, workers, executor):
+    """Scores texts, taking unchanged ones from the result store when there is one."""
+    def compute(batch):
+        metrics.count('sentiment_computed', len(batch))
+        return sentiment_engine.analyze_batch(batch, workers=workers, executor=executor)
+    with metrics.stage('sentiment', items=len(texts)):
+        if store is None:
+            return compute(list(texts))
+        return store.map('sentiment', sentiment_engine.version, texts, compute)
+
+
+def run_batch(args, preprocessor, sentiment_engine, executor, store):
+    """Loads the whole dataset into one DataFrame, processes it and saves it in one go."""
     print("Loading and preprocessing data...")
     try:
-        df = pd.read_csv('sotu_speeches.csv')
+        with metrics.stage('load') as timer:
+            df = pd.read_csv(args.input)
+            timer['items'] = len(df)
     except FileNotFoundError:
-        print("Error: sotu_speeches.csv not found.")
+        print(f"Error: {args.input} not found.")
         print("Please run scraper.py first to generate the data.")
         exit()
 
     print("Preprocessing text... (this may take a moment)")
-    df['cleaned_speech'] = df['speech_text'].apply(preprocess_text)
+    # Spread the documents over all CPU cores; each worker loads its resources once
+    df['cleaned_speech'] = preprocess_texts(df['speech_text'], preprocessor, store, args.workers, executor)
 
     print("Analyzing sentiment...")
-    # Apply sentiment analysis to the ORIGINAL speech text
-    df['sentiment_score'] = df['speech_text'].apply(analyze_sentiment)
+    # Apply sentiment analysis to the ORIGINAL speech text: the whole speech, plus
+    # paragraph by paragraph so the dashboard can show sentiment over its course
+    sentiment = analyze_texts(df['speech_text'], sentiment_engine, store, args.workers, executor)
+    df = df.join(pd.DataFrame(sentiment, index=df.index))
 
     # Save the processed data with sentiment scores
-    df.to_csv('sotu_speeches_processed.csv', index=False)
+    with metrics.stage('write', items=len(df)):
+        df.to_csv(args.output, index=False)
 
-    print("Data processing and sentiment analysis complete. Saved to 'sotu_speeches_processed.csv'.")
+    print(f"Data processing and sentiment analysis complete. Saved to '{args.output}'.")
     print("\nHere's a sample with the new 'sentiment_score' column:")
     print(df[['president', 'date', 'sentiment_score']].head())
 
     # Quick check: Find the most positive and most negative speeches
-    most_positive = df.loc[df['sentiment_score'].idxmax()]
-    most_negative = df.loc[df['sentiment_score'].idxmin()]
+    print_extremes(df.loc[df['sentiment_score'].idxmax()], df.loc[df['sentiment_score'].idxmin()])
 
-    print("\nMost Positive Speech:")
-    print(
-        f"  President: {most_positive['president']}, Date: {most_positive['date']}, Score: {most_positive['sentiment_score']:.2f}")
 
-    print("\nMost Negative Speech:")
-    print(
-        f"  President: {most_negative['president']}, Date: {most_negative['date']}, Score: {most_negative['sentiment_score']:.2f}")
+# --- Streaming mode ---
+# Each stage is a generator over DataFrame chunks, so only `chunk_size` rows
+# are in memory at a time, however large the input file is.
+
+def read_chunks(path, chunk_size):
+    yield from pd.read_csv(path, chunksize=chunk_size)
+
 
+def preprocess_chunks(chunks, preprocessor, store, workers, executor):
+    for chunk in chunks:
+        chunk['cleaned_speech'] = preprocess_texts(chunk['speech_text'], preprocessor, store, workers, executor)
+        yield chunk
+
+
+def sentiment_chunks(chunks, sentiment_engine, store, workers, executor):
+    for chunk in chunks:
+        sentiment = analyze_texts(chunk['speech_text'], sentiment_engine, store, workers, executor)
+        yield chunk.join(pd.DataFrame(sentiment, index=chunk.index))
+
+
+def write_chunks(chunks, path):
+    """Appends each chunk to the output CSV as it arrives and yields it on."""
+    for i, chunk in enumerate(chunks):
+        with metrics.stage('write', items=len(chunk)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        yield chunk
+
+
+def run_streaming(args, preprocessor, sentiment_engine, executor, store):
+    """Moves the dataset through preprocess and sentiment in chunks, appending to the output."""
+    if not os.path.exists(args.input):
+        print(f"Error: {args.input} not found.")
+        print("Please run scraper.py first to generate the data.")
+        exit()
+
+    print(f"Streaming {args.input} in chunks of {args.chunk_size} rows...")
+    chunks = read_chunks(args.input, args.chunk_size)
+    chunks = preprocess_chunks(chunks, preprocessor, store, args.workers, executor)
+    chunks = sentiment_chunks(chunks, sentiment_engine, store, args.workers, executor)
+    chunks = write_chunks(chunks, args.output)
+
+    # Keep only running totals and the two extreme rows, never the whole dataset
+    total = 0
+    most_positive = most_negative = None
+    for chunk in chunks:
+        total += len(chunk)
+        chunk_positive = chunk.loc[chunk['sentiment_score'].idxmax()]
+        chunk_negative = chunk.loc[chunk['sentiment_score'].idxmin()]
+        if most_positive is None or chunk_positive['sentiment_score'] > most_positive['sentiment_score']:
+            most_positive = chunk_positive[['president', 'date', 'sentiment_score']]
+        if most_negative is None or chunk_negative['sentiment_score'] < most_negative['sentiment_score']:
+            most_negative = chunk_negative[['president', 'date', 'sentiment_score']]
+        print(f"  -> {total} rows processed")
+
+    if total == 0:
+        print(f"Error: {args.input} has no rows.")
+        exit()
+
+    print(f"Data processing and sentiment analysis complete. Saved {total} rows to '{args.output}'.")
+    print_extremes(most_positive, most_negative)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocess the scraped speeches and analyze their sentiment.")
+    parser.add_argument('--input', default='sotu_speeches.csv')
+    parser.add_argument('--output', default='sotu_speeches_processed.csv')
+    parser.add_argument('--stream', action='store_true',
+                        help="Process the input in chunks with bounded memory, appending to the output as it goes.")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Rows per chunk in streaming mode.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes (1 = no pool).")
+    parser.add_argument('--tokenizer', choices=['nltk', 'fast'], default='nltk',
+                        help="Tokenizer used by preprocessing (see preprocessing.fast_tokenize).")
+    parser.add_argument('--cache', default='analyzer_cache.sqlite',
+                        help="Result store of earlier runs; only new or changed rows are recomputed.")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute every row and don't store results.")
+    parser.add_argument('--store-dir', default='corpus_store',
+                        help="Columnar corpus store built from the output for the app (see corpus_store.py).")
+    parser.add_argument('--no-store', action='store_true', help="Only write the output CSV.")
+    parser.add_argument('--metrics', help="Write stage timings and counters here (JSON, or Prometheus for .prom).")
+    args = parser.parse_args()
+
+    preprocessor = Preprocessor(tokenizer=args.tokenizer)
+    sentiment_engine = SentimentEngine()
+    run = run_streaming if args.stream else run_batch
+    store = None if args.no_cache else ResultStore(args.cache)
+
+    # One pool of worker processes shared by both stages (and every chunk)
+    if args.workers == 1:
+        run(args, preprocessor, sentiment_engine, None, store)
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            run(args, preprocessor, sentiment_engine, executor, store)
+
+    if not args.no_store:
+        # The app loads this instead of the CSV: metadata up front, speech text on demand
+        with metrics.stage('corpus_store') as timer:
+            manifest = convert_csv(args.output, args.store_dir)
+            timer['items'] = manifest['rows']
+        with metrics.stage('keyword_index', items=manifest['rows']):
+            index = build_index(args.store_dir)
+        with metrics.stage('similarity_index', items=manifest['rows']):
+            build_similarity_index(args.store_dir)
+        with metrics.stage('aggregates', items=manifest['rows']):
+            build_aggregates(args.store_dir, index)
+        print(f"\nCorpus store written to '{args.store_dir}' ({manifest['rows']} speeches, "
+              f"keyword index of {len(index.postings)} terms, similarity index, aggregates).")
+
+    if store is not None:
+        print(f"\nRun report ({store.path}):")
+        print(store.report())
+        store.close()
+
+    print("\nStage timings:")
+    print(metrics.report())
+    if args.metrics:
+        metrics.save(args.metrics)
+
+
+if __name__ == '__main__':
+    main()
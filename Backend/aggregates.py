@@ -0,0 +1,180 @@
+"""
+Precomputed aggregates of the corpus, for the dashboard's per-president and comparison views.
+
+Built once at processing time from the corpus store's metadata and the keyword index,
+at four levels: 'president', 'year', 'decade' and 'president_year'. Each level is a
+small DataFrame with the number of speeches, sentiment statistics, token totals and
+first/last year per group. Keyword counts and rates (per 10,000 words) per group are
+read from a precomputed table for the corpus's most frequent words, and otherwise
+summed from the keyword index in one vectorized pass.
+
+Analyzer.py builds it next to the corpus store; to build it for an existing store:
+    python aggregates.py corpus_store
+"""
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+from corpus_store import CorpusStore
+from keyword_index import load_index, tokenize
+
+AGGREGATES_FILE = 'aggregates.pkl'
+# Bumped when the cube's columns change, so stored cubes of an older layout are rebuilt
+CUBE_FORMAT = 2
+
+LEVELS = {
+    'president': ['president'],
+    'year': ['year'],
+    'decade': ['decade'],
+    'president_year': ['president', 'year'],
+}
+
+# Per-speech columns summarized per group, when the processed data has them. The
+# sentiment_score stats are score_*, apart from the per-speech sentiment_* segment columns
+SENTIMENT_STATS = {
+    'score_mean': ('sentiment_score', 'mean'),
+    'score_std': ('sentiment_score', 'std'),
+    'score_min': ('sentiment_score', 'min'),
+    'score_max': ('sentiment_score', 'max'),
+    'segment_sentiment_mean': ('sentiment_mean', 'mean'),
+}
+
+# Speech list columns kept per president, for the speech selector
+SPEECH_COLUMNS = ['doc_id', 'date', 'year', 'sentiment_score', 'url']
+
+
+class AggregateCube:
+    """
+    The aggregates of one version of the corpus. Query with stats(), term_counts(),
+    term_rates() and speeches(); words outside the precomputed table need the keyword
+    index, attached by load_aggregates().
+    """
+
+    def __init__(self, metadata, tokens, index=None, top_terms=1000, data_version=None):
+        self.data_version = data_version
+        self.format = CUBE_FORMAT
+        self.index = index
+        metadata = metadata.copy()
+        metadata['tokens'] = tokens
+        metadata['decade'] = (metadata['year'] // 10) * 10
+        self.doc_ids = metadata['doc_id'].to_numpy(dtype=np.int64)
+
+        self.levels, self.codes = {}, {}
+        for level, keys in LEVELS.items():
+            stats = {'speeches': ('doc_id', 'count'), 'tokens': ('tokens', 'sum')}
+            stats.update({name: spec for name, spec in SENTIMENT_STATS.items() if spec[0] in metadata})
+            stats.update({'first_year': ('year', 'min'), 'last_year': ('year', 'max')})
+            grouped = metadata.groupby(keys, sort=True)
+            self.levels[level] = grouped.agg(**stats)
+            # Group number of every speech (-1: no year, e.g. an undated speech), for summing
+            # per-speech counts; ngroup() leaves those NaN
+            self.codes[level] = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+        # Speeches per president, oldest first, with the labels the selector shows
+        speeches = metadata[[c for c in SPEECH_COLUMNS if c in metadata] + ['president']].sort_values(['date', 'doc_id'])
+        speeches['label'] = speeches['date'].dt.strftime('%B %d, %Y').fillna('Unknown date')
+        self._speeches = {president: group.drop(columns='president').reset_index(drop=True)
+                          for president, group in speeches.groupby('president')}
+
+        # Counts of the most frequent words per group, so those need no index at all
+        self.term_table = {}
+        if index is not None:
+            frequent = sorted(index.postings, key=lambda term: -len(index.postings[term]))[:top_terms]
+            for term in frequent:
+                counts = index.counts(term, self.doc_ids)
+                self.term_table[term] = {level: self._sum(level, counts) for level in LEVELS}
+
+    def __getstate__(self):
+        # The keyword index is saved on its own
+        state = dict(self.__dict__)
+        state['index'] = None
+        return state
+
+    def _sum(self, level, per_speech):
+        codes = self.codes[level]
+        keep = codes >= 0
+        return np.bincount(codes[keep], weights=per_speech[keep], minlength=len(self.levels[level]))
+
+    def save(self, path):
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    # --- Queries ---
+
+    def stats(self, level, key=None):
+        """The aggregates of every group at `level`, or of one group (e.g. a president's name)."""
+        frame = self.levels[level]
+        return frame if key is None else frame.loc[key]
+
+    def presidents(self, chronological=False):
+        frame = self.levels['president']
+        if chronological:
+            return frame.sort_values(['first_year', 'last_year']).index.tolist()
+        return frame.index.tolist()
+
+    def speeches(self, president):
+        """The president's speeches (doc_id, date, year, sentiment_score, url, label), oldest first."""
+        return self._speeches[president]
+
+    def term_counts(self, query, level):
+        """Whole-word / phrase occurrences of `query` per group at `level`, as a Series."""
+        tokens = tokenize(query)
+        if len(tokens) == 1 and tokens[0] in self.term_table:
+            counts = self.term_table[tokens[0]][level]
+        elif self.index is None:
+            raise ValueError(f"{query!r} isn't precomputed; load the cube with load_aggregates() to query the index")
+        else:
+            counts = self._sum(level, self.index.counts(query, self.doc_ids))
+        return pd.Series(counts.astype(np.int64), index=self.levels[level].index, name='count')
+
+    def term_rates(self, query, level, per=10_000):
+        """Occurrences of `query` per `per` words, per group at `level`."""
+        tokens = self.levels[level]['tokens'].replace(0, np.nan)
+        return (self.term_counts(query, level) / tokens * per).rename('rate')
+
+
+def build_aggregates(store_dir, index=None):
+    """Builds the aggregates of a corpus store and saves them inside the store."""
+    store = CorpusStore(store_dir)
+    index = index if index is not None else load_index(store_dir)
+    metadata = store.metadata()
+    # Words per speech, from the keyword index's tokens
+    tokens_by_doc = dict(zip(index.doc_ids.tolist(), np.diff(index.token_ptr).tolist()))
+    tokens = metadata['doc_id'].map(tokens_by_doc).fillna(0).astype(np.int64)
+    cube = AggregateCube(metadata, tokens.to_numpy(), index, data_version=store.data_version)
+    cube.save(os.path.join(store_dir, AGGREGATES_FILE))
+    return cube
+
+
+def load_aggregates(store_dir):
+    """The store's aggregates with the keyword index attached, rebuilt if missing or stale."""
+    index = load_index(store_dir)
+    path = os.path.join(store_dir, AGGREGATES_FILE)
+    cube = None
+    if os.path.exists(path):
+        cube = AggregateCube.load(path)
+        if cube.data_version != CorpusStore(store_dir).data_version or getattr(cube, 'format', 1) != CUBE_FORMAT:
+            cube = None
+    if cube is None:
+        cube = build_aggregates(store_dir, index)
+    cube.index = index
+    return cube
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python aggregates.py <store_dir>")
+        exit()
+    import aggregates
+    cube = aggregates.build_aggregates(sys.argv[1])
+    sizes = ", ".join(f"{len(frame)} {level} groups" for level, frame in cube.levels.items())
+    print(f"Aggregated {len(cube.doc_ids)} speeches into {os.path.join(sys.argv[1], AGGREGATES_FILE)}: {sizes}.")
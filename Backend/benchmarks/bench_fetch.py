@@ -0,0 +1,77 @@
+"""
+Benchmarks the fetch layer against the local stand-in server.
+
+Compares the old one-by-one `requests.get` loop with the pooled, concurrent
+Fetcher, and checks that the Fetcher stayed within its per-host rate limit
+and returned the pages in link order.
+
+Run from the Backend directory:
+    python benchmarks/bench_fetch.py --speeches 60 --latency 0.1 --rate 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetcher import Fetcher
+from standin_server import StandInServer, speech_path
+
+
+def run_sequential(urls):
+    pages = []
+    for url in urls:
+        response = requests.get(url)
+        pages.append(response.content if response.ok else None)
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--speeches', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.1, help="Simulated server latency per request (s)")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Share of requests answered with 429/503")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=20.0, help="Per-host rate limit (requests/s)")
+    parser.add_argument('--skip-sequential', action='store_true')
+    args = parser.parse_args()
+
+    # Sequential baseline (no errors injected, since it has no retries)
+    if not args.skip_sequential:
+        with StandInServer(args.speeches, latency=args.latency) as server:
+            urls = [server.base_url + speech_path(i) for i in range(args.speeches)]
+            start = time.perf_counter()
+            run_sequential(urls)
+            elapsed = time.perf_counter() - start
+        print(f"sequential : {elapsed:7.2f}s  {args.speeches / elapsed:7.1f} pages/s")
+
+    with StandInServer(args.speeches, latency=args.latency, error_rate=args.error_rate, retry_after=0) as server:
+        urls = [server.base_url + speech_path(i) for i in range(args.speeches)]
+        with Fetcher(workers=args.workers, rate=args.rate, backoff=0.05) as fetcher:
+            start = time.perf_counter()
+            results = fetcher.fetch_all(urls)
+            elapsed = time.perf_counter() - start
+
+        failed = sum(not r.ok for r in results)
+        retries = sum(r.attempts - 1 for r in results)
+        in_order = all(r.url == url for r, url in zip(results, urls))
+        peak_rate = server.max_requests_per_window(1.0)
+        print(f"fetcher    : {elapsed:7.2f}s  {args.speeches / elapsed:7.1f} pages/s  "
+              f"(workers={args.workers}, rate={args.rate}/s)")
+        print(f"  retries={retries} failed={failed} in_order={in_order}")
+        print(f"  peak requests in any 1s window: {peak_rate} (limit {args.rate:g} + burst)")
+        print(f"  peak concurrent connections   : {server.max_concurrent} (workers {args.workers})")
+
+        # Politeness contract: one bucket's worth of burst on top of the steady rate
+        burst = max(1.0, args.rate)
+        ok = in_order and server.max_concurrent <= args.workers and peak_rate <= args.rate + burst
+        if not ok:
+            print("FAILED: ordering or politeness limits were violated")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Keyword query benchmark: the app's old substring counting against the keyword index.
+
+For each query, times counting occurrences in one president's speeches and in all
+speeches, both by scanning the text (the old count_keyword, text.lower().count) and
+with KeywordIndex, and checks the index against a whole-word regex scan. Also shows
+how far the substring counts were off ("war" matching "award", ...).
+
+Run from the Backend directory:
+    python benchmarks/bench_keyword.py --docs 500
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import load_corpus
+from keyword_index import KeywordIndex, tokenize
+
+QUERIES = ['war', 'nation', 'peace', 'united states', 'the people', "nation's", 'mr. speaker']
+
+
+def whole_word_pattern(query):
+    """The regex equivalent of an index query: its tokens as whole words, separated by non-words."""
+    return re.compile(r"(?<![^\W_])" + r"[\W_]+".join(map(re.escape, tokenize(query))) + r"(?![^\W_])",
+                      re.IGNORECASE)
+
+
+def best_of(func, repeat):
+    """Best time of `repeat` calls, in milliseconds, and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    df = load_corpus(args.docs)
+    texts = df['speech_text'].fillna('').tolist()
+    start = time.perf_counter()
+    index = KeywordIndex.build(enumerate(texts))
+    print(f"Indexed {len(texts)} speeches ({len(index.token_starts)} tokens) in {time.perf_counter() - start:.2f}s")
+
+    president = df['president'].value_counts().index[0]
+    president_ids = [i for i, name in enumerate(df['president']) if name == president]
+    print(f"One president: {president}, {len(president_ids)} speeches\n")
+
+    mismatches = 0
+    print(f"{'query':<14} {'scan 1 pres':>11} {'index 1 pres':>12} {'scan all':>9} {'index all':>10}  substring / whole-word")
+    for query in QUERIES:
+        key = query.lower()
+        scan_one, _ = best_of(lambda: [texts[i].lower().count(key) for i in president_ids], args.repeat)
+        index_one, _ = best_of(lambda: index.counts(query, president_ids), args.repeat)
+        scan_all, substring = best_of(lambda: [text.lower().count(key) for text in texts], args.repeat)
+        index_all, counts = best_of(lambda: index.counts(query), args.repeat)
+
+        pattern = whole_word_pattern(query)
+        expected = [len(pattern.findall(text)) for text in texts]
+        mismatches += expected != counts.tolist()
+        print(f"{query:<14} {scan_one:9.3f}ms {index_one:10.3f}ms {scan_all:7.2f}ms {index_all:8.3f}ms  "
+              f"{sum(substring)} / {sum(expected)}")
+
+    print(f"\nIndex counts identical to a whole-word regex scan: {mismatches == 0}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
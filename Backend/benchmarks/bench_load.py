@@ -0,0 +1,111 @@
+"""
+Load-time and memory benchmark: the app's old CSV path against the corpus store.
+
+Each path runs in a fresh subprocess, which reports its wall time and peak RSS:
+- csv:   read the whole processed CSV and parse its dates (the old load_data)
+- store: open the corpus store, load the metadata, then fetch one speech's text by id
+
+Without --csv, a synthetic processed CSV is generated (the cleaned_speech and
+sentiment columns are stand-ins; only their size matters here).
+
+Run from the Backend directory:
+    python benchmarks/bench_load.py --docs 5000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_corpus
+from corpus_store import convert_csv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the subprocess; prints {"seconds": ..., "peak_rss_mb": ...}
+LOADERS = {
+    'csv': """
+import pandas as pd
+df = pd.read_csv(PATH)
+df['date'] = pd.to_datetime(df['date'])
+df['year'] = df['date'].dt.year
+""",
+    'store': """
+from corpus_store import CorpusStore
+store = CorpusStore(PATH)
+df = store.metadata()
+text = store.text(len(store) // 2)
+""",
+}
+
+# Peak RSS from VmHWM: unlike ru_maxrss, it isn't inherited from the parent across exec
+HARNESS = """
+import json, resource, sys, time
+sys.path.insert(0, {backend!r})
+PATH = {path!r}
+start = time.perf_counter()
+{loader}
+seconds = time.perf_counter() - start
+try:
+    with open('/proc/self/status') as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'seconds': seconds, 'peak_rss_mb': peak_kb / 1024}}))
+"""
+
+
+def synthetic_processed_csv(path, n_docs):
+    df = generate_corpus(n_docs)
+    rng = random.Random(0)
+    df['cleaned_speech'] = df['speech_text'].str.lower()
+    for column in ('sentiment_score', 'sentiment_mean', 'sentiment_min', 'sentiment_max'):
+        df[column] = [round(rng.uniform(-1, 1), 4) for _ in range(n_docs)]
+    df['sentiment_trajectory'] = [json.dumps([round(rng.uniform(-1, 1), 4) for _ in range(10)]) for _ in range(n_docs)]
+    df['sentiment_segments'] = [json.dumps([round(rng.uniform(-1, 1), 4) for _ in range(50)]) for _ in range(n_docs)]
+    df.to_csv(path, index=False)
+
+
+def measure(loader, path, repeat):
+    """Best wall time and peak RSS of `repeat` fresh-process runs."""
+    runs = []
+    for _ in range(repeat):
+        code = HARNESS.format(backend=BACKEND_DIR, path=path, loader=LOADERS[loader])
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(r['seconds'] for r in runs), min(r['peak_rss_mb'] for r in runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=5000)
+    parser.add_argument('--csv', help="An existing processed CSV instead of a synthetic one")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(tmp, 'sotu_speeches_processed.csv')
+            synthetic_processed_csv(csv_path, args.docs)
+        store_dir = os.path.join(tmp, 'corpus_store')
+
+        start = time.perf_counter()
+        manifest = convert_csv(csv_path, store_dir)
+        print(f"Corpus: {manifest['rows']} speeches, CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, "
+              f"converted in {time.perf_counter() - start:.2f}s")
+
+        results = {'csv': measure('csv', csv_path, args.repeat), 'store': measure('store', store_dir, args.repeat)}
+        for loader, (seconds, rss) in results.items():
+            print(f"{loader:<6}: {seconds:6.2f}s  peak RSS {rss:7.1f} MB")
+        print(f"Speedup: {results['csv'][0] / results['store'][0]:.1f}x, "
+              f"memory: {results['csv'][1] - results['store'][1]:.1f} MB less")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmarks and checks the speech page parser against saved HTML pages.
+
+1. Equivalence: every fixture page in fixtures/html must give exactly the same
+   record from speech_parser.parse_speech as from the original full-page
+   BeautifulSoup extraction (kept below as `legacy_parse`).
+2. Throughput: pages per second for the legacy extraction, the targeted parser
+   in one process, and the targeted parser in a process pool.
+
+Run from the Backend directory:
+    python benchmarks/bench_parse.py --repeat 50 --workers 4
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_parser import parse_speech, parse_pages
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+
+
+def legacy_parse(url, content):
+    """The original extraction from scraper.py: full html.parser tree, regexes compiled per call."""
+    speech_soup = BeautifulSoup(content, 'html.parser')
+    main_content = speech_soup.find('div', class_='col-sm-8')
+    if not main_content:
+        return None
+    president_tag = main_content.find('h3', class_='diet-title')
+    if president_tag and president_tag.find('a'):
+        president_name = president_tag.find('a').text.strip()
+    else:
+        president_name_container = main_content.find('div', class_='field-docs-person')
+        if president_name_container:
+            president_name = president_name_container.text.strip()
+        else:
+            president_name = "Unknown"
+    date_div = main_content.find('div', class_='field-docs-start-date-time')
+    if date_div and date_div.find('span', class_='date-display-single'):
+        date_str = date_div.find('span', class_='date-display-single').text.strip()
+    else:
+        date_str = "Unknown"
+    speech_content_div = main_content.find('div', class_='field-docs-content')
+    if speech_content_div:
+        raw_text = speech_content_div.get_text(separator='\n', strip=True)
+        cleaned_text = re.sub(r'\[.*?\]', '', raw_text, flags=re.DOTALL)
+        cleaned_text = re.sub(r'^\s*.*?(?:President|Speaker|Representative|Audience members?|Rep\.|Senator)\s*\..*$\n?', '', cleaned_text, flags=re.MULTILINE)
+        speech_text = re.sub(r'\n\s*\n', '\n', cleaned_text).strip()
+    else:
+        speech_text = "Content not found."
+    return {'president': president_name, 'date': date_str, 'url': url, 'speech_text': speech_text}
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def check_equivalence(pages):
+    """Returns the names of fixture pages whose parsed record differs from the legacy extraction."""
+    mismatches = []
+    for name, content in pages:
+        expected = legacy_parse(name, content)
+        actual = parse_speech(name, content)
+        if expected != actual:
+            mismatches.append(name)
+            print(f"MISMATCH {name}\n  legacy: {expected!r}\n  new   : {actual!r}")
+    return mismatches
+
+
+def timed(label, n, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24}: {elapsed:7.3f}s  {n / elapsed:8.1f} pages/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50, help="How many times to parse each fixture page")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--fixtures', default=FIXTURE_DIR)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f"No fixture pages found in {args.fixtures}")
+        sys.exit(1)
+
+    mismatches = check_equivalence(pages)
+    print(f"Equivalence: {len(pages) - len(mismatches)}/{len(pages)} fixture pages match the legacy extraction")
+
+    # Pages without main content print a "Skipping" line; keep them out of the timing runs
+    pages = [(name, content) for name, content in pages if legacy_parse(name, content) is not None]
+    names = [name for name, _ in pages] * args.repeat
+    contents = [content for _, content in pages] * args.repeat
+    n = len(names)
+
+    timed("legacy (html.parser)", n, lambda: [legacy_parse(u, c) for u, c in zip(names, contents)])
+    timed("targeted, 1 process", n, lambda: [parse_speech(u, c) for u, c in zip(names, contents)])
+    timed(f"targeted, {args.workers} processes", n, lambda: parse_pages(names, contents, workers=args.workers))
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput benchmark for the preprocessing step, in documents per second.
+
+Compares the original per-call preprocess_text (stopwords and lemmatizer rebuilt on
+every call, one core) with the reusable Preprocessor, in one process and spread
+over a process pool. Every variant's output must be identical to the original.
+
+Run from the Backend directory:
+    python benchmarks/bench_preprocess.py --docs 200 --workers 4
+Add --against-csv to also compare with the cleaned_speech column of an existing
+sotu_speeches_processed.csv.
+"""
+import argparse
+import os
+import string
+import sys
+import time
+
+import pandas as pd
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import load_corpus
+from preprocessing import Preprocessor
+
+
+def legacy_preprocess_text(text):
+    """The original preprocess_text, which rebuilds its resources on every call."""
+    tokens = word_tokenize(text.lower())
+    stop_words = set(stopwords.words('english'))
+    punct = string.punctuation
+    lemmatizer = WordNetLemmatizer()
+    cleaned_tokens = []
+    for token in tokens:
+        if token not in stop_words and token not in punct and token.isalpha():
+            cleaned_tokens.append(lemmatizer.lemmatize(token))
+    return " ".join(cleaned_tokens)
+
+
+def timed(label, n, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}: {elapsed:7.2f}s  {n / elapsed:8.1f} docs/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunksize', type=int, default=16)
+    parser.add_argument('--against-csv', action='store_true',
+                        help="Also compare with cleaned_speech in sotu_speeches_processed.csv")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.docs)['speech_text'].tolist()
+    n = len(texts)
+    print(f"Corpus: {n} documents, {sum(len(t) for t in texts) / 1e6:.1f}M characters")
+
+    expected = timed("legacy preprocess_text", n, lambda: [legacy_preprocess_text(t) for t in texts])
+    preprocessor = Preprocessor()
+    single = timed("Preprocessor, 1 process", n, lambda: preprocessor.process_batch(texts, workers=1))
+    pooled = timed(f"Preprocessor, {args.workers} processes", n,
+                   lambda: preprocessor.process_batch(texts, workers=args.workers, chunksize=args.chunksize))
+    print(f"Lemma cache: {preprocessor.lemma_cache_info()}")
+
+    mismatches = sum(a != b for a, b in zip(expected, single)) + sum(a != b for a, b in zip(expected, pooled))
+    print(f"Output identical to legacy: {mismatches == 0}")
+
+    if args.against_csv:
+        processed = pd.read_csv('sotu_speeches_processed.csv').head(args.docs)
+        saved = processed['cleaned_speech'].fillna('').tolist()
+        differing = sum(a != b for a, b in zip(saved, pooled))
+        print(f"Rows differing from sotu_speeches_processed.csv: {differing}/{len(saved)}")
+        mismatches += differing
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
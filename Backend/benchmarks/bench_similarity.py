@@ -0,0 +1,121 @@
+"""
+Latency and quality benchmark for the similarity index.
+
+On a corpus with `--duplicates` planted near-duplicates (copies of random speeches with
+1% of their words changed):
+- top-k similar speeches: LSH query time against exact scoring of every speech, and the
+  recall of the LSH results (the fraction of the exact top k it finds)
+- near duplicates: time to find all pairs, how many of the planted pairs were found,
+  and how many pairs were compared against all n * (n - 1) / 2
+
+Run from the Backend directory:
+    python benchmarks/bench_similarity.py --docs 20000 --queries 200
+
+The corpus is synthetic cleaned speeches, each mixing two of `--themes` themes with
+their own words, so that similar speeches exist; --real uses the scraped speeches
+(or corpus.py's stand-in), preprocessed.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import load_corpus
+from preprocessing import Preprocessor
+from similarity_index import SimilarityIndex
+from topic_modeler import TopicModeler
+
+
+def themed_corpus(n_docs, n_themes, rng, words_per_theme=300, length=(300, 1500)):
+    """Cleaned speeches as bags of words drawn from two themes each (Zipf-like within a theme)."""
+    themes = [[f"t{theme}w{i}" for i in range(words_per_theme)] for theme in range(n_themes)]
+    weights = [1 / (i + 1) for i in range(words_per_theme)]
+    documents = []
+    for _ in range(n_docs):
+        first, second = rng.sample(themes, 2)
+        size = rng.randint(*length)
+        share = rng.random()
+        words = (rng.choices(first, weights, k=int(size * share))
+                 + rng.choices(second, weights, k=size - int(size * share)))
+        rng.shuffle(words)
+        documents.append(' '.join(words))
+    return documents
+
+
+def perturb(text, rng, rate=0.01):
+    """A copy of `text` with about `rate` of its words replaced by others from it."""
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * rate)):
+        words[i] = rng.choice(words)
+    return ' '.join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--duplicates', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--themes', type=int, default=50)
+    parser.add_argument('--real', action='store_true', help="Use the scraped speeches instead")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    if args.real:
+        texts = load_corpus(args.docs)['speech_text'].fillna('').tolist()
+        documents = Preprocessor(tokenizer='fast').process_batch(texts, workers=args.workers)
+    else:
+        documents = themed_corpus(args.docs, args.themes, rng)
+    originals = rng.sample(range(len(documents)), args.duplicates)
+    planted = {(i, len(documents) + j) for j, i in enumerate(originals)}
+    documents += [perturb(documents[i], rng) for i in originals]
+    n = len(documents)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        matrix = TopicModeler(documents, cache_dir=cache_dir).matrix
+    start = time.perf_counter()
+    index = SimilarityIndex(matrix, range(n), documents)
+    print(f"Corpus: {n} speeches, {matrix.shape[1]} terms; index built in {time.perf_counter() - start:.2f}s "
+          f"({index.n_tables} tables of {index.n_bits} bits)")
+
+    queries = rng.sample(range(n), min(args.queries, n))
+    lsh_times, exact_times, recalls, candidates = [], [], [], []
+    for doc_id in queries:
+        start = time.perf_counter()
+        approximate = index.similar(doc_id, args.k)
+        lsh_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        exact = index.similar(doc_id, args.k, exact=True)
+        exact_times.append(time.perf_counter() - start)
+        recalls.append(len({d for d, _ in approximate} & {d for d, _ in exact}) / args.k)
+        candidates.append(len(index.candidates(index.matrix[doc_id])))
+
+    print(f"\nTop-{args.k} similar ({len(queries)} queries):")
+    for label, times in (("LSH", lsh_times), ("exact", exact_times)):
+        print(f"  {label:<6}: median {1000 * np.median(times):7.3f} ms, p95 {1000 * np.percentile(times, 95):7.3f} ms")
+    print(f"  LSH recall@{args.k}: {np.mean(recalls):.3f}, candidates scored: {np.mean(candidates):.0f} of {n}")
+
+    start = time.perf_counter()
+    pairs = index.near_duplicates()
+    elapsed = time.perf_counter() - start
+    found = {(a, b) for a, b, _ in pairs}
+    compared = len({(a, b) for buckets in index.band_buckets for rows in buckets.values()
+                    for i, a in enumerate(rows) for b in rows[i + 1:]})
+    print(f"\nNear duplicates: {len(pairs)} pairs in {1000 * elapsed:.1f} ms; "
+          f"planted pairs found: {len(planted & found)}/{len(planted)}")
+    print(f"  pairs compared: {compared} of {n * (n - 1) // 2}")
+    start = time.perf_counter()
+    for doc_id in queries:
+        index.duplicates_of(doc_id)
+    print(f"  duplicates_of one speech: {1000 * (time.perf_counter() - start) / len(queries):.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
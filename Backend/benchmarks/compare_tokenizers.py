@@ -0,0 +1,102 @@
+"""
+Equivalence harness and benchmark for the 'fast' tokenizer.
+
+For every document, compares the alphabetic tokens of word_tokenize (the 'nltk'
+mode) with fast_tokenize, and reports:
+- how many documents give identical token sequences,
+- every token that one mode produced and the other didn't, with counts and an example,
+- how many documents end up with an identical cleaned_speech after stopword
+  removal and lemmatization,
+and times both modes, for the tokenizer alone and for the whole Preprocessor.
+
+Run from the Backend directory:
+    python benchmarks/compare_tokenizers.py --docs 200
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+from nltk.tokenize import word_tokenize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import load_corpus
+from preprocessing import Preprocessor, fast_tokenize
+
+
+def nltk_alpha_tokens(text):
+    return [token for token in word_tokenize(text) if token.isalpha()]
+
+
+def context(text, token, width=40):
+    """A snippet of `text` around the first whole-word occurrence of `token`, for the report."""
+    i = text.find(token)
+    if i < 0:
+        return ""
+    return text[max(0, i - width):i + len(token) + width].replace('\n', ' ')
+
+
+def compare(texts):
+    identical = 0
+    missing, extra = Counter(), Counter()   # produced only by nltk / only by fast
+    examples = {}
+    total_tokens = 0
+    for text in texts:
+        lowered = text.lower()
+        expected = nltk_alpha_tokens(lowered)
+        actual = fast_tokenize(lowered)
+        total_tokens += len(expected)
+        if expected == actual:
+            identical += 1
+            continue
+        expected_counts, actual_counts = Counter(expected), Counter(actual)
+        for token, count in (expected_counts - actual_counts).items():
+            missing[token] += count
+            examples.setdefault(('missing', token), context(lowered, token))
+        for token, count in (actual_counts - expected_counts).items():
+            extra[token] += count
+            examples.setdefault(('extra', token), context(lowered, token))
+    return identical, total_tokens, missing, extra, examples
+
+
+def timed(label, n, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30}: {elapsed:7.2f}s  {n / elapsed:8.1f} docs/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--top', type=int, default=20, help="How many differing tokens to list")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.docs)['speech_text'].fillna('').tolist()
+    n = len(texts)
+
+    identical, total_tokens, missing, extra, examples = compare(texts)
+    differing_tokens = sum(missing.values()) + sum(extra.values())
+    print(f"Token sequences identical: {identical}/{n} documents")
+    print(f"Token differences: {differing_tokens} of {total_tokens} alphabetic tokens "
+          f"({100 * differing_tokens / max(total_tokens, 1):.4f}%)")
+    for label, counter in (("Only in nltk", missing), ("Only in fast", extra)):
+        for token, count in counter.most_common(args.top):
+            kind = 'missing' if counter is missing else 'extra'
+            print(f"  {label}: {token!r} x{count}   ...{examples[(kind, token)]}...")
+
+    print()
+    lowered = [text.lower() for text in texts]
+    timed("tokenize, nltk", n, lambda: [nltk_alpha_tokens(t) for t in lowered])
+    timed("tokenize, fast", n, lambda: [fast_tokenize(t) for t in lowered])
+    cleaned_nltk = timed("preprocess, nltk", n, lambda: Preprocessor(tokenizer='nltk').process_batch(texts, workers=1))
+    cleaned_fast = timed("preprocess, fast", n, lambda: Preprocessor(tokenizer='fast').process_batch(texts, workers=1))
+    same_output = sum(a == b for a, b in zip(cleaned_nltk, cleaned_fast))
+    print(f"\ncleaned_speech identical: {same_output}/{n} documents")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark corpora: the real scraped dataset when it is available, otherwise a
+synthetic corpus of SOTU-like speeches that exercises the same code paths
+(punctuation, contractions, abbreviations, numbers, curly quotes, annotations).
+"""
+import os
+import random
+
+import pandas as pd
+
+PRESIDENTS = [
+    "George Washington", "Thomas Jefferson", "Andrew Jackson", "Abraham Lincoln",
+    "Theodore Roosevelt", "Woodrow Wilson", "Franklin D. Roosevelt", "Harry S. Truman",
+    "Dwight D. Eisenhower", "John F. Kennedy", "Lyndon B. Johnson", "Ronald Reagan",
+    "Bill Clinton", "George W. Bush", "Barack Obama", "Joseph R. Biden",
+]
+
+# Content words, roughly in order of how often they appear in SOTU addresses
+TOPIC_WORDS = (
+    "nation people government congress year country world american states united america "
+    "great war peace law public power economy tax business program federal work job policy "
+    "security freedom defense military force right health care education school child family "
+    "energy oil trade foreign treaty commerce industry labor wage worker farmer agriculture "
+    "budget deficit debt spending revenue dollar bank currency credit market growth prosperity "
+    "constitution citizen liberty justice court crime border immigration territory indian "
+    "army navy soldier veteran terrorism enemy ally democracy communist soviet union "
+    "challenge opportunity reform progress future generation hope strength responsibility"
+).split()
+
+FUNCTION_WORDS = (
+    "the of and to in a that is for it we our this be by with as have will on are not has "
+    "which their all they its been must from at should more can but was these so every"
+).split()
+
+SPECIAL_TOKENS = [
+    "Mr. Speaker", "the U.S. Government", "don't", "can't", "won't", "it's", "nation's",
+    "the people’s", "well-being", "1,000", "$4.5 billion", "1990s", "cannot", "gonna",
+    "“freedom”", "(and so on)", "etc.", "self-government", "ours—and theirs",
+]
+
+
+def _sentence(rng):
+    words = []
+    for _ in range(rng.randint(8, 28)):
+        roll = rng.random()
+        if roll < 0.45:
+            words.append(rng.choice(FUNCTION_WORDS))
+        elif roll < 0.97:
+            # Zipf-like: favour the front of the topic list
+            words.append(TOPIC_WORDS[min(int(rng.paretovariate(1.2)) - 1, len(TOPIC_WORDS) - 1)])
+        else:
+            words.append(rng.choice(SPECIAL_TOKENS))
+        if rng.random() < 0.06:
+            words[-1] += ","
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + rng.choice([".", ".", ".", "?", "!"])
+
+
+def synthetic_speech(rng, paragraphs=None):
+    """One speech: newline-separated paragraphs of sentences, like scraper.py output."""
+    paragraphs = paragraphs or rng.randint(20, 80)
+    return "\n".join(
+        " ".join(_sentence(rng) for _ in range(rng.randint(2, 7)))
+        for _ in range(paragraphs)
+    )
+
+
+def generate_corpus(n_docs, seed=0):
+    """A DataFrame shaped like sotu_speeches.csv with `n_docs` synthetic speeches."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(n_docs):
+        year = 1790 + (i * 235) // max(n_docs, 1)
+        records.append({
+            'president': PRESIDENTS[min(i * len(PRESIDENTS) // max(n_docs, 1), len(PRESIDENTS) - 1)],
+            'date': f"{year}-01-{(i % 28) + 1:02d}",
+            'url': f"https://example.invalid/speech/{i}",
+            'speech_text': synthetic_speech(rng),
+        })
+    return pd.DataFrame(records)
+
+
+def load_corpus(n_docs=None, csv_path='sotu_speeches.csv', seed=0):
+    """The scraped corpus if `csv_path` exists (first `n_docs` rows), otherwise a synthetic one."""
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path)
+        return df.head(n_docs) if n_docs else df
+    return generate_corpus(n_docs or 200, seed=seed)
@@ -0,0 +1,241 @@
+"""
+Load test of the query service: many dashboards' worth of concurrent queries.
+
+Starts query_service.py on a local port (or uses a running one with --url) and runs
+`--clients` concurrent clients for `--duration` seconds. Each client keeps asking the
+queries a dashboard asks, picked at random with the weights in MIX, for random
+presidents, keywords (a few popular ones, so repeats hit the response cache) and
+speeches. Before that, a burst of `--burst` identical topic-model queries arrives at
+once, to check that they are answered by one computation (request coalescing).
+
+Reports requests per second, p50/p95/p99 latency per query, how the answers were
+served (cache hit, miss, coalesced) and errors.
+
+Without --url or --data-dir, the service runs on a synthetic corpus of `--docs`
+speeches (bench_load.py's processed CSV). Run from the Backend directory:
+    python benchmarks/load_test_service.py --docs 2000 --clients 50 --duration 30
+    python benchmarks/load_test_service.py --url http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_load import synthetic_processed_csv
+
+SERVICE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'query_service.py')
+
+# A few popular keywords and a long tail, like dashboard users type them
+KEYWORDS = ['economy', 'war', 'peace', 'nation', 'united states', 'the people'] + \
+           ['tax', 'health care', 'education', 'freedom', 'congress', 'energy', 'jobs', 'budget', 'security',
+            'trade', 'family', 'children', 'democracy', 'liberty', 'immigration', 'defense', 'debt', 'law']
+
+# Relative frequency of each query in the workload
+MIX = {
+    'stats': 10,
+    'term_counts': 10,
+    'term_rates': 10,
+    'speeches': 8,
+    'keyword_counts': 8,
+    'pages': 6,
+    'page_text': 6,
+    'matches': 6,
+    'similar': 4,
+    'topics': 2,
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def keyword():
+    """One of the popular keywords most of the time, else one from the tail."""
+    return random.choice(KEYWORDS[:6]) if random.random() < 0.7 else random.choice(KEYWORDS[6:])
+
+
+class Workload:
+    """Random dashboard queries over the corpus the service holds."""
+
+    def __init__(self, presidents, speeches, topics):
+        self.presidents = presidents
+        self.speeches = speeches  # president -> doc_ids
+        self.doc_ids = [doc_id for ids in speeches.values() for doc_id in ids]
+        self.topics = topics
+
+    def next(self):
+        name = random.choices(list(MIX), weights=list(MIX.values()))[0]
+        president = random.choice(self.presidents)
+        doc_id = random.choice(self.doc_ids)
+        params = {
+            'stats': lambda: {'level': 'president_year', 'key': president},
+            'term_counts': lambda: {'query': keyword(), 'level': 'president_year'},
+            'term_rates': lambda: {'query': keyword(), 'level': random.choice(['president', 'decade'])},
+            'speeches': lambda: {'president': president},
+            'keyword_counts': lambda: {'query': keyword(),
+                                       'doc_ids': ','.join(map(str, self.speeches[president]))},
+            'pages': lambda: {'doc_id': doc_id},
+            'page_text': lambda: {'doc_id': doc_id, 'start': 0, 'end': 4000},
+            'matches': lambda: {'query': keyword(), 'doc_id': doc_id},
+            'similar': lambda: {'doc_id': doc_id, 'k': 10},
+            'topics': lambda: {'num_topics': self.topics, 'words': random.choice([5, 10, 15])},
+        }[name]()
+        return name, params
+
+
+async def get(session, url, name, params, results):
+    start = time.perf_counter()
+    try:
+        async with session.get(f"{url}/api/{name}", params=params) as response:
+            await response.read()
+            ok, how = response.status == 200, response.headers.get('X-Cache', 'error')
+    except aiohttp.ClientError:
+        ok, how = False, 'error'
+    results.append((name, (time.perf_counter() - start) * 1000, ok, how))
+
+
+async def client(session, url, workload, deadline, results):
+    while time.perf_counter() < deadline:
+        name, params = workload.next()
+        await get(session, url, name, params, results)
+
+
+async def run(args, url):
+    connector = aiohttp.TCPConnector(limit=args.clients + args.burst)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def fetch(path):
+            async with session.get(url + path) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        presidents = await fetch('/api/presidents')
+        speeches = {}
+        for president in presidents:
+            speeches[president] = [s['doc_id'] for s in await fetch(f'/api/speeches?president={president}')]
+        workload = Workload(presidents, speeches, args.topics)
+
+        # Identical queries all at once: one computation, the rest coalesced (or cache hits)
+        burst = []
+        if args.burst:
+            await asyncio.gather(*(get(session, url, 'topics', {'num_topics': args.topics, 'words': 10}, burst)
+                                   for _ in range(args.burst)))
+
+        before = await fetch('/status')
+        results = []
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(client(session, url, workload, deadline, results) for _ in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        after = await fetch('/status')
+    return burst, results, elapsed, before, after
+
+
+def summarize(results, elapsed):
+    """Per query (and in total): requests, errors, requests/s, latency percentiles and cache outcomes."""
+    by_query = {}
+    for name, ms, ok, how in results:
+        by_query.setdefault(name, []).append((ms, ok, how))
+    by_query['all'] = [(ms, ok, how) for _, ms, ok, how in results]
+    summary = {}
+    for name, rows in by_query.items():
+        latencies = np.array([ms for ms, _, _ in rows])
+        hows = [how for _, _, how in rows]
+        summary[name] = {
+            'requests': len(rows),
+            'errors': sum(not ok for _, ok, _ in rows),
+            'requests_per_second': round(len(rows) / elapsed, 1),
+            **{f'p{q}_ms': round(float(np.percentile(latencies, q)), 2) for q in (50, 95, 99)},
+            **{how: hows.count(how) for how in ('hit', 'miss', 'coalesced')},
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="A running query service (default: start one)")
+    parser.add_argument('--data-dir', help="Data directory for the started service (default: a synthetic corpus)")
+    parser.add_argument('--docs', type=int, default=2000, help="Speeches in the synthetic corpus")
+    parser.add_argument('--clients', type=int, default=50, help="Concurrent clients")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of load")
+    parser.add_argument('--burst', type=int, default=20, help="Identical topic queries sent at once first")
+    parser.add_argument('--topics', type=int, default=5, help="Number of topics of the queried model")
+    parser.add_argument('--workers', type=int, default=4, help="Query threads of the started service")
+    parser.add_argument('--timeout', type=float, default=600, help="Per-request timeout (seconds)")
+    parser.add_argument('--output', help="Save the results (JSON) here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = None
+        url = args.url.rstrip('/') if args.url else None
+        if url is None:
+            data_dir = args.data_dir
+            if data_dir is None:
+                data_dir = tmp
+                synthetic_processed_csv(os.path.join(tmp, 'sotu_speeches_processed.csv'), args.docs)
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            service = subprocess.Popen([sys.executable, SERVICE, '--data-dir', data_dir, '--port', str(port),
+                                        '--workers', str(args.workers)])
+            # The first start builds the corpus store and indexes
+            print(f"Starting the query service on {data_dir}...")
+            started = time.perf_counter()
+            while True:
+                try:
+                    with socket.create_connection(('127.0.0.1', port), timeout=1):
+                        break
+                except OSError:
+                    if service.poll() is not None:
+                        print("Error: the query service exited.")
+                        exit()
+                    time.sleep(0.5)
+            print(f"Service up after {time.perf_counter() - started:.1f}s.")
+
+        try:
+            burst, results, elapsed, before, after = asyncio.run(run(args, url))
+        finally:
+            if service is not None:
+                service.terminate()
+                service.wait()
+
+    if burst:
+        outcomes = {how: sum(h == how for *_, h in burst) for how in ('miss', 'coalesced', 'hit', 'error')}
+        slowest = max(ms for _, ms, _, _ in burst)
+        print(f"Burst of {len(burst)} identical topic queries: {outcomes['miss']} computed, {outcomes['coalesced']} "
+              f"coalesced, {outcomes['hit']} cache hits, {outcomes['error']} errors; slowest {slowest:.0f} ms")
+
+    summary = summarize(results, elapsed)
+    print(f"\n{args.clients} clients for {elapsed:.1f}s against {url}")
+    print(f"{'query':<15} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'hits':>6} {'misses':>6} {'coalesced':>9} {'errors':>6}")
+    for name, s in sorted(summary.items(), key=lambda item: item[0] == 'all'):
+        print(f"{name:<15} {s['requests']:>8} {s['requests_per_second']:>8} {s['p50_ms']:>8} {s['p95_ms']:>8} "
+              f"{s['p99_ms']:>8} {s['hit']:>6} {s['miss']:>6} {s['coalesced']:>9} {s['errors']:>6}")
+    served = {name: after[name] - before[name] for name in ('cache_hits', 'cache_misses', 'coalesced', 'cache_evictions')}
+    print(f"\nService: {served['cache_hits']} cache hits, {served['cache_misses']} computed, "
+          f"{served['coalesced']} coalesced, {served['cache_evictions']} evictions; "
+          f"{after['cache_entries']} answers cached ({after['cache_bytes'] / 1024 / 1024:.1f} MB)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'clients': args.clients, 'seconds': round(elapsed, 3), 'queries': summary,
+                       'service': served, 'burst': len(burst)}, f, indent=2)
+    if summary.get('all', {}).get('errors'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
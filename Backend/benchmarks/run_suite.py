@@ -0,0 +1,198 @@
+"""
+Benchmark suite: throughput of every pipeline stage on a reproducible synthetic corpus,
+with regression checks against an earlier run.
+
+Stages (timed with instrumentation.py, like the real pipeline):
+- fetch:            pages from the local stand-in server through the Fetcher
+- parse:            the saved HTML pages in fixtures/html, `--parse-repeat` times over
+- preprocess, sentiment: the first `--sample` speeches (both scale linearly per speech)
+- corpus_store, data_load, keyword_index, keyword_query, vectorize, lda_fit,
+  similarity_index, aggregates, chart_render: the whole corpus of `--docs` speeches
+  (corpus.py's generator, with stand-in cleaned text and sentiment columns)
+
+Run from the Backend directory, e.g. for 10k speeches, saving the results:
+    python benchmarks/run_suite.py --docs 10000 --repeat 3 --output bench-10k.json
+and after a change, to flag every stage whose throughput dropped by more than 20%:
+    python benchmarks/run_suite.py --docs 10000 --repeat 3 --baseline bench-10k.json
+(exits with status 1 on a regression). --docs goes up to 100000. With --repeat, each
+stage keeps its best run, which makes the comparison much less noisy.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'Frontend'))
+
+from matplotlib.figure import Figure
+
+from aggregates import build_aggregates
+from bench_load import synthetic_processed_csv
+from chart_cache import ChartCache
+from corpus import generate_corpus
+from corpus_store import CorpusStore, convert_csv
+from fetcher import Fetcher
+from instrumentation import metrics
+from keyword_index import build_index
+from preprocessing import Preprocessor
+from sentiment import SentimentEngine
+from similarity_index import build_similarity_index
+from speech_parser import parse_speech
+from standin_server import StandInServer, speech_path
+from topic_modeler import TopicModeler
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+
+QUERIES = ['war', 'nation', 'peace', 'united states', 'the people', "nation's"]
+
+
+def run_stages(args, tmp):
+    """Runs every stage once; their timings end up in `metrics`."""
+    # Network and parsing, offline
+    with StandInServer(args.fetch_pages, latency=0) as server:
+        urls = [server.base_url + speech_path(i) for i in range(args.fetch_pages)]
+        with Fetcher(workers=8, rate=10_000) as fetcher, metrics.stage('fetch', items=len(urls)):
+            fetcher.fetch_all(urls)
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((path, f.read()))
+    # (no_main_content.html is expected to fail, and says so on every parse)
+    with metrics.stage('parse', items=len(pages) * args.parse_repeat), contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(args.parse_repeat):
+            for url, content in pages:
+                parse_speech(url, content)
+
+    # Per-speech text processing, on a sample
+    texts = generate_corpus(args.sample)['speech_text'].tolist()
+    preprocessor, sentiment_engine = Preprocessor(tokenizer=args.tokenizer), SentimentEngine()
+    with metrics.stage('preprocess', items=len(texts)):
+        preprocessor.process_batch(texts, workers=args.workers)
+    with metrics.stage('sentiment', items=len(texts)):
+        sentiment_engine.analyze_batch(texts, workers=args.workers)
+
+    # Whole-corpus stages
+    csv_path = os.path.join(tmp, 'sotu_speeches_processed.csv')
+    synthetic_processed_csv(csv_path, args.docs)
+    store_dir = os.path.join(tmp, 'corpus_store')
+    with metrics.stage('corpus_store', items=args.docs):
+        convert_csv(csv_path, store_dir)
+    with metrics.stage('data_load', items=args.docs):
+        store = CorpusStore(store_dir)
+        store.metadata()
+    with metrics.stage('keyword_index', items=args.docs):
+        index = build_index(store_dir)
+    with metrics.stage('keyword_query', items=len(QUERIES)):
+        for query in QUERIES:
+            index.counts(query)
+
+    topic_cache = os.path.join(tmp, 'topic_cache')
+    documents = [text for _, text in store.iter_texts('cleaned_speech') if text is not None]
+    TopicModeler(documents, cache_dir=topic_cache).model(args.topics)
+    with metrics.stage('similarity_index', items=args.docs):
+        build_similarity_index(store_dir, topic_cache_dir=topic_cache)
+    with metrics.stage('aggregates', items=args.docs):
+        cube = build_aggregates(store_dir, index)
+
+    charts = ChartCache()
+    for president in cube.presidents():
+        def draw():
+            fig = Figure(figsize=(10, 6))
+            ax = fig.subplots()
+            cube.stats('president_year', president)['score_mean'].plot(ax=ax, marker='o')
+            return fig
+        _, info = charts.get(('sentiment_over_time', president), draw)
+        metrics.add('chart_render', info['render_ms'] / 1000, items=1)
+
+
+def compare(results, baseline, tolerance):
+    """Prints each stage's throughput against the baseline's; returns the regressed stages."""
+    if baseline.get('docs') != results['docs'] or baseline.get('sample') != results['sample']:
+        print(f"Note: the baseline ran with {baseline.get('docs')} speeches (sample {baseline.get('sample')}); "
+              f"throughputs may not be comparable.")
+    print(f"\n{'stage':<18} {'baseline/s':>11} {'now/s':>11} {'change':>8}")
+    regressed = []
+    for name, stage in results['stages'].items():
+        before = baseline['stages'].get(name, {}).get('items_per_second')
+        now = stage['items_per_second']
+        if not before or not now:
+            continue
+        change = now / before - 1
+        flag = ''
+        if change < -tolerance:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<18} {before:>11.1f} {now:>11.1f} {change:>+7.0%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=10000, help="Speeches in the corpus (10 to 100000)")
+    parser.add_argument('--sample', type=int, default=200, help="Speeches for preprocess and sentiment")
+    parser.add_argument('--fetch-pages', type=int, default=100)
+    parser.add_argument('--parse-repeat', type=int, default=50)
+    parser.add_argument('--topics', type=int, default=10)
+    parser.add_argument('--tokenizer', choices=['nltk', 'fast'], default='fast')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--repeat', type=int, default=1, help="Runs of the suite; each stage keeps its best")
+    parser.add_argument('--output', help="Save the results (JSON) here, e.g. as a later --baseline")
+    parser.add_argument('--prometheus', help="Also write the metrics in Prometheus text format here")
+    parser.add_argument('--baseline', help="Results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed throughput drop per stage")
+    args = parser.parse_args()
+    if not 10 <= args.docs <= 100_000:
+        print("Error: --docs must be between 10 and 100000.")
+        exit()
+
+    start = time.perf_counter()
+    best = {}
+    for _ in range(args.repeat):
+        metrics.reset()
+        with tempfile.TemporaryDirectory() as tmp:
+            run_stages(args, tmp)
+        for name, stage in metrics.to_dict()['stages'].items():
+            if name not in best or (stage['items_per_second'] or 0) > (best[name]['items_per_second'] or 0):
+                best[name] = stage
+    results = {
+        'docs': args.docs,
+        'sample': args.sample,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'total_seconds': round(time.perf_counter() - start, 3),
+        'stages': best,
+        'peak_rss_bytes': metrics.peak_rss_bytes,
+    }
+    # Report and export the best runs
+    metrics.stages = {name: {key: value for key, value in stage.items() if key != 'items_per_second'}
+                      for name, stage in best.items()}
+
+    print(f"Suite: {args.docs} speeches (sample {args.sample}) in {results['total_seconds']:.1f}s\n")
+    print(metrics.report())
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.prometheus:
+        metrics.save(args.prometheus)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"\nFAILED: throughput of {', '.join(regressed)} dropped by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+A local HTTP stand-in for presidency.ucsb.edu, so the scraper can be benchmarked offline.
+
+It serves a list page linking to `num_speeches` speech pages with the same structure
+as the real site, adds optional latency, injects 429/503 responses at a given rate,
+and records every request so politeness (requests per second, concurrent
+connections) can be checked after a run. Pages carry an ETag and honour
+If-None-Match, so conditional GETs from the HTTP cache get a 304.
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIST_PATH = "/documents/presidential-documents-archive-guidebook/annual-messages-congress-the-state-the-union"
+
+SPEECH_TEMPLATE = """<html><head><title>State of the Union {i}</title></head>
+<body>
+<div class="container">
+<div class="col-sm-4"><p>Sidebar</p></div>
+<div class="col-sm-8">
+<h3 class="diet-title"><a href="/people/president/{i}">President Number {i}</a></h3>
+<div class="field-docs-start-date-time"><span class="date-display-single">January {day}, {year}</span></div>
+<div class="field-docs-content">
+<p>Mr. Speaker, Mr. Vice President, Members of Congress:</p>
+<p>The state of our Union is strong. [<i>Applause</i>] We will build a stronger economy for every family.</p>
+<p>The President. Thank you.</p>
+<p>Audience members. U-S-A!</p>
+{paragraphs}
+</div>
+</div>
+</div>
+</body></html>"""
+
+PARAGRAPH = ("<p>Our nation faces challenges in health care, education, and national security, "
+             "and the Congress must act together to meet them. [Laughter]</p>")
+
+
+def speech_path(i):
+    return f"/documents/address-before-joint-session-the-congress-the-state-the-union-{i}"
+
+
+def render_list_page(num_speeches):
+    rows = "\n".join(
+        f'<tr><td><a href="{speech_path(i)}">State of the Union {i}</a></td></tr>'
+        for i in range(num_speeches)
+    )
+    return f'<html><body><table class="table-responsive">{rows}</table></body></html>'
+
+
+def render_speech_page(i, paragraphs=40):
+    return SPEECH_TEMPLATE.format(i=i, day=(i % 28) + 1, year=1790 + i, paragraphs="\n".join([PARAGRAPH] * paragraphs))
+
+
+class StandInServer:
+    """
+    Runs the stand-in site on 127.0.0.1 in a background thread.
+    Use as a context manager; `base_url` points at the running server.
+    """
+
+    def __init__(self, num_speeches=100, latency=0.05, error_rate=0.0, retry_after=None, seed=0):
+        self.num_speeches = num_speeches
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.request_log = []  # (start_time, end_time, path, status)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.max_concurrent = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def list_url(self):
+        return self.base_url + LIST_PATH
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def max_requests_per_window(self, window=1.0):
+        """The largest number of requests started within any `window` seconds."""
+        starts = sorted(entry[0] for entry in self.request_log)
+        best, left = 0, 0
+        for right, start in enumerate(starts):
+            while start - starts[left] > window:
+                left += 1
+            best = max(best, right - left + 1)
+        return best
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                start = time.monotonic()
+                with server._lock:
+                    server._active += 1
+                    server.max_concurrent = max(server.max_concurrent, server._active)
+                    inject_error = server._random.random() < server.error_rate
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, body = self._route(inject_error)
+                    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                    if status == 200 and self.headers.get('If-None-Match') == etag:
+                        status, body = 304, b""
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    if status in (200, 304):
+                        self.send_header("ETag", etag)
+                    if status == 429 and server.retry_after is not None:
+                        self.send_header("Retry-After", str(server.retry_after))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server._active -= 1
+                        server.request_log.append((start, time.monotonic(), self.path, status))
+
+            def _route(self, inject_error):
+                if inject_error:
+                    return server._random.choice([429, 503]), b"Try again later"
+                if self.path == LIST_PATH:
+                    return 200, render_list_page(server.num_speeches).encode('utf-8')
+                prefix = speech_path('')
+                if self.path.startswith(prefix) and self.path[len(prefix):].isdigit():
+                    return 200, render_speech_page(int(self.path[len(prefix):])).encode('utf-8')
+                return 404, b"Not found"
+
+        return Handler
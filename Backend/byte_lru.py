@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+class ByteLRU:
+    """
+    In-memory LRU of bytes values, holding at most `max_bytes` bytes in total.
+
+    Used for the query service's JSON answers and the app's rendered charts. Not
+    thread-safe; callers sharing one across threads hold their own lock.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self.size = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """The value of `key`, now the most recently used, or None if it is not cached."""
+        if key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key, value):
+        """
+        Caches `value` unless `key` is already cached or the value alone is over the cap.
+        Returns the keys evicted, least recently used first, to bring the size under the cap.
+        """
+        if key in self._items or len(value) > self.max_bytes:
+            return []
+        self._items[key] = value
+        self.size += len(value)
+        evicted = []
+        while self.size > self.max_bytes:
+            old_key, old_value = self._items.popitem(last=False)
+            self.size -= len(old_value)
+            evicted.append(old_key)
+        return evicted
+
+    def clear(self):
+        self._items.clear()
+        self.size = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,179 @@
+"""
+Columnar, memory-mappable corpus store.
+
+A processed CSV is split into two Arrow IPC files in a store directory:
+- metadata.arrow: the small per-speech columns (president, date, year, url, sentiment
+  roll-ups, ...), loaded whole by the app at startup
+- texts.arrow: the large text columns (speech_text, cleaned_speech, sentiment_segments),
+  memory-mapped and read one speech at a time, by id
+plus manifest.json with the row count and a data version.
+
+Every speech gets a doc_id, its row number in the source CSV.
+
+Convert an existing CSV once with:
+    python corpus_store.py sotu_speeches_processed.csv corpus_store
+"""
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Large columns that are only needed one speech at a time
+TEXT_COLUMNS = ['speech_text', 'cleaned_speech', 'sentiment_segments']
+
+# Arrow types of the columns scraper.py and Analyzer.py write, so a column that happens to
+# be empty in the first chunk doesn't fix the wrong type for the rest of the file. Other
+# columns keep the type they are read with in the first chunk, or are text if empty there
+COLUMN_TYPES = {
+    'doc_id': pa.int64(),
+    'president': pa.string(),
+    'date': pa.timestamp('us'),
+    'year': pa.int64(),
+    'url': pa.string(),
+    'speech_text': pa.string(),
+    'cleaned_speech': pa.string(),
+    'sentiment_score': pa.float64(),
+    'sentiment_mean': pa.float64(),
+    'sentiment_min': pa.float64(),
+    'sentiment_max': pa.float64(),
+    'sentiment_trajectory': pa.string(),
+    'sentiment_segments': pa.string(),
+}
+
+METADATA_FILE = 'metadata.arrow'
+TEXTS_FILE = 'texts.arrow'
+MANIFEST_FILE = 'manifest.json'
+
+
+def _schema(frame):
+    """The Arrow schema a chunk's columns are stored with."""
+    fields = []
+    for field in pa.Schema.from_pandas(frame, preserve_index=False):
+        default = pa.string() if frame[field.name].isna().all() else field.type
+        fields.append(pa.field(field.name, COLUMN_TYPES.get(field.name, default)))
+    return pa.schema(fields)
+
+
+def convert_csv(csv_path, store_dir, chunk_size=5000):
+    """
+    Converts a (processed) speeches CSV into a corpus store, reading it in chunks so
+    memory stays bounded for large archives. Returns the manifest.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    metadata_path = os.path.join(store_dir, METADATA_FILE)
+    texts_path = os.path.join(store_dir, TEXTS_FILE)
+
+    metadata_digest, texts_digest = hashlib.sha256(), hashlib.sha256()
+    metadata_writer = texts_writer = None
+    metadata_schema = texts_schema = None
+    text_columns = []
+    rows = 0
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            chunk.insert(0, 'doc_id', range(rows, rows + len(chunk)))
+            rows += len(chunk)
+            chunk['date'] = pd.to_datetime(chunk['date'], errors='coerce')
+            chunk['year'] = chunk['date'].dt.year.astype('Int64')
+
+            text_columns = [c for c in TEXT_COLUMNS if c in chunk.columns]
+            metadata = chunk.drop(columns=text_columns)
+            texts = chunk[['doc_id'] + text_columns].copy()
+            for column in text_columns:
+                texts[column] = texts[column].astype('string')
+            # Row hashes, so the data version doesn't depend on the chunk size
+            metadata_digest.update(pd.util.hash_pandas_object(metadata, index=False).values.tobytes())
+            texts_digest.update(pd.util.hash_pandas_object(texts, index=False).values.tobytes())
+
+            if metadata_schema is None:
+                metadata_schema, texts_schema = _schema(metadata), _schema(texts)
+            metadata_table = pa.Table.from_pandas(metadata, schema=metadata_schema, preserve_index=False)
+            texts_table = pa.Table.from_pandas(texts, schema=texts_schema, preserve_index=False)
+            if metadata_writer is None:
+                metadata_writer = pa.ipc.new_file(metadata_path + '.tmp', metadata_table.schema)
+                texts_writer = pa.ipc.new_file(texts_path + '.tmp', texts_table.schema)
+            metadata_writer.write_table(metadata_table)
+            texts_writer.write_table(texts_table)
+    finally:
+        if metadata_writer is not None:
+            metadata_writer.close()
+            texts_writer.close()
+
+    if metadata_writer is None:
+        raise ValueError(f"{csv_path} has no rows")
+
+    os.replace(metadata_path + '.tmp', metadata_path)
+    os.replace(texts_path + '.tmp', texts_path)
+    manifest = {
+        'source': os.path.basename(csv_path),
+        'rows': rows,
+        'text_columns': text_columns,
+        'data_version': hashlib.sha256((metadata_digest.hexdigest() + texts_digest.hexdigest()).encode()).hexdigest()[:16],
+    }
+    with open(os.path.join(store_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class CorpusStore:
+    """Read access to a corpus store: metadata up front, speech text on demand by doc_id."""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self._texts = None
+
+    @staticmethod
+    def exists(store_dir):
+        return os.path.exists(os.path.join(store_dir, MANIFEST_FILE))
+
+    @property
+    def data_version(self):
+        """Changes whenever the stored data changes; use it in cache keys."""
+        return self.manifest['data_version']
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def metadata(self):
+        """All metadata columns as a DataFrame, without any speech text."""
+        with pa.memory_map(os.path.join(self.store_dir, METADATA_FILE)) as source:
+            return pa.ipc.open_file(source).read_pandas()
+
+    def _text_table(self):
+        # Memory-mapped: only the pages of the speeches actually read are loaded
+        if self._texts is None:
+            source = pa.memory_map(os.path.join(self.store_dir, TEXTS_FILE))
+            self._texts = pa.ipc.open_file(source).read_all()
+        return self._texts
+
+    def text(self, doc_id, column='speech_text'):
+        """One speech's text (or another text column) by doc_id."""
+        value = self._text_table().column(column)[int(doc_id)].as_py()
+        return value if value is not None else ''
+
+    def text_slice(self, doc_id, start, end, column='speech_text'):
+        """Characters start:end of one speech's text, without reading the rest of it into Python."""
+        value = pc.utf8_slice_codeunits(self._text_table().column(column).slice(int(doc_id), 1), start, end)[0].as_py()
+        return value if value is not None else ''
+
+    def texts(self, doc_ids, column='speech_text'):
+        return [self.text(doc_id, column) for doc_id in doc_ids]
+
+    def iter_texts(self, column='speech_text'):
+        """Yields (doc_id, text) for every speech, one record batch at a time."""
+        for batch in self._text_table().select(['doc_id', column]).to_batches():
+            yield from zip(batch.column(0).to_pylist(), batch.column(1).to_pylist())
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python corpus_store.py <processed_csv> <store_dir>")
+        exit()
+    manifest = convert_csv(sys.argv[1], sys.argv[2])
+    print(f"Converted {manifest['rows']} speeches from {sys.argv[1]} into {sys.argv[2]} "
+          f"(data version {manifest['data_version']}).")
@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth another attempt: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchResult:
+    """The outcome of fetching one URL. `content` is None when the fetch failed."""
+    url: str
+    content: bytes = None
+    status: int = None
+    error: str = None
+    headers: dict = field(default_factory=dict)
+    attempts: int = 0
+    from_cache: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None and self.content is not None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Refills at `rate` tokens per second and holds at most `capacity` tokens,
+    so callers get short bursts but a bounded long-run request rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Fetcher:
+    """
+    Connection-pooled, concurrent HTTP fetcher.
+    - One shared requests.Session, so connections are reused across pages
+    - A bounded thread pool for concurrency
+    - A token-bucket rate limit per host, to stay polite to the server
+    - Retries with exponential backoff on 429/5xx and connection errors
+    - Optionally, conditional GETs against an on-disk HTTPCache
+    """
+
+    def __init__(self, headers=None, workers=8, rate=2.0, burst=None,
+                 max_retries=4, backoff=0.5, max_backoff=30.0, timeout=30, cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _backoff_delay(self, attempt, response):
+        # Honour the server's Retry-After header when it sends one
+        if response is not None and 'Retry-After' in response.headers:
+            retry_after = response.headers['Retry-After']
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delay, 0.0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        delay = self.backoff * (2 ** attempt)
+        return min(delay + random.uniform(0, self.backoff), self.max_backoff)
+
+    def fetch(self, url, headers=None):
+        """Fetches a single URL, retrying transient failures. Never raises for HTTP errors."""
+        headers = dict(headers or {})
+        if self.cache is not None:
+            headers.update(self.cache.conditional_headers(url))
+
+        response = None
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self._bucket(url).acquire()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                response = None
+                error = str(e)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    result = FetchResult(url=url, status=response.status_code,
+                                         headers=dict(response.headers), attempts=attempt + 1)
+                    if response.status_code >= 400:
+                        result.error = f"HTTP {response.status_code}"
+                    elif response.status_code == 304 and self.cache is not None:
+                        # Not modified since our cached copy: serve the body from disk
+                        _, result.content = self.cache.get(url)
+                        result.from_cache = True
+                        if result.content is None:
+                            result.error = "HTTP 304 but no cached copy"
+                    elif response.status_code != 304:
+                        result.content = response.content
+                        if self.cache is not None:
+                            self.cache.store(url, response.content, response.headers)
+                    return result
+                error = f"HTTP {response.status_code}"
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff_delay(attempt, response))
+
+        return FetchResult(url=url, status=response.status_code if response is not None else None,
+                           error=error, attempts=self.max_retries + 1)
+
+    def iter_fetch(self, urls):
+        """Yields (index, FetchResult) pairs as soon as each fetch completes."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch, url): i for i, url in enumerate(urls)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def fetch_all(self, urls, on_result=None):
+        """
+        Fetches every URL concurrently and returns the results in the original order.
+        `on_result(index, result)` is called as each fetch completes (e.g. for progress).
+        """
+        results = [None] * len(urls)
+        for i, result in self.iter_fetch(urls):
+            results[i] = result
+            if on_result is not None:
+                on_result(i, result)
+        return results
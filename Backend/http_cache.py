@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import time
+
+
+class HTTPCache:
+    """
+    Persistent on-disk response cache keyed by URL.
+
+    Each entry is a pair of files named after the URL's SHA-256:
+    `<key>.json` holds the URL, ETag, Last-Modified and fetch time,
+    `<key>.body` holds the raw response bytes.
+    Writes go through a temporary file and os.replace, so a crash never
+    leaves a half-written entry behind.
+    """
+
+    def __init__(self, cache_dir='.http_cache'):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """Returns (metadata, body) for a cached URL, or (None, None) if it is not cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None, None
+        return meta, body
+
+    def conditional_headers(self, url):
+        """Headers for a conditional GET, so the server can answer 304 Not Modified."""
+        meta, _ = self.get(url)
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url, body, headers):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        # Body first: a metadata file always points at a complete body
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
@@ -0,0 +1,181 @@
+"""
+Pipeline instrumentation: stage timers, counters and peak memory.
+
+    from instrumentation import metrics
+
+    with metrics.stage('preprocess', items=len(texts)):
+        ...
+    with metrics.stage('data_load') as timer:
+        df = ...
+        timer['items'] = len(df)
+    metrics.count('fetch_errors')
+
+Each stage adds up its calls, wall time and items processed, and the peak resident memory
+of the process while it ran (sampled by a background thread every `sample_interval`
+seconds, and at its start and end). Time measured elsewhere, e.g. in worker processes,
+is added with metrics.add(). Totals export as JSON or in the Prometheus text format;
+scraper.py, Analyzer.py and topic_modeler.py write them with --metrics <path> (a .prom
+path for Prometheus, e.g. for node_exporter's textfile collector).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# psutil reads memory on every platform; without it, /proc is used (Linux only)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Prefix of the exported Prometheus metric names
+PREFIX = 'sotu'
+
+
+def rss_bytes():
+    """Resident memory of this process, or None where it can't be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+    except (OSError, StopIteration):
+        return None
+
+
+class Metrics:
+    """Stage timings, counters and peak memory of one process."""
+
+    def __init__(self, sample_interval=0.05):
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._sampler = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.peak_rss_bytes = rss_bytes()
+            self._open = {}  # stage -> timers running
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'items': 0, 'peak_rss_bytes': None})
+
+    def _sample(self):
+        rss = rss_bytes()
+        if rss is None:
+            return
+        with self._lock:
+            self.peak_rss_bytes = max(self.peak_rss_bytes or 0, rss)
+            for name in self._open:
+                stage = self.stages[name]
+                stage['peak_rss_bytes'] = max(stage['peak_rss_bytes'] or 0, rss)
+
+    def _run_sampler(self):
+        while True:
+            time.sleep(self.sample_interval)
+            self._sample()
+
+    @contextmanager
+    def stage(self, name, items=0):
+        """
+        Times the block as one call of stage `name`, which processed `items` items (or as many
+        as the block sets in the yielded dict's 'items').
+        """
+        if self._sampler is None and self.sample_interval:
+            self._sampler = threading.Thread(target=self._run_sampler, name='metrics-sampler', daemon=True)
+            self._sampler.start()
+        with self._lock:
+            self._stage(name)
+            self._open[name] = self._open.get(name, 0) + 1
+        self._sample()
+        timer = {'items': items}
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            seconds = time.perf_counter() - start
+            self._sample()
+            with self._lock:
+                self._open[name] -= 1
+                if not self._open[name]:
+                    del self._open[name]
+            self.add(name, seconds, timer['items'])
+
+    def add(self, name, seconds, items=0, calls=1):
+        """Adds time measured elsewhere (e.g. in a worker process) to stage `name`."""
+        with self._lock:
+            stage = self._stage(name)
+            stage['calls'] += calls
+            stage['seconds'] += seconds
+            stage['items'] += items
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # --- Export ---
+
+    def to_dict(self):
+        with self._lock:
+            stages = {name: {**stage, 'items_per_second': stage['items'] / stage['seconds']
+                             if stage['items'] and stage['seconds'] else None}
+                      for name, stage in self.stages.items()}
+            return {'stages': stages, 'counters': dict(self.counters), 'peak_rss_bytes': self.peak_rss_bytes,
+                    'pid': os.getpid(), 'time': time.time()}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        data = self.to_dict()
+        lines = []
+
+        def family(name, kind, description, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+                lines.append(f"{PREFIX}_{name}{{{label_text}}} {value}" if label_text else f"{PREFIX}_{name} {value}")
+
+        stages = data['stages']
+        family('stage_calls_total', 'counter', "Times each pipeline stage ran.",
+               [({'stage': name}, s['calls']) for name, s in stages.items()])
+        family('stage_seconds_total', 'counter', "Wall time spent in each pipeline stage.",
+               [({'stage': name}, round(s['seconds'], 6)) for name, s in stages.items()])
+        family('stage_items_total', 'counter', "Items (pages, speeches, charts, ...) each stage processed.",
+               [({'stage': name}, s['items']) for name, s in stages.items()])
+        family('stage_peak_rss_bytes', 'gauge', "Peak resident memory of the process while the stage ran.",
+               [({'stage': name}, s['peak_rss_bytes']) for name, s in stages.items()
+                if s['peak_rss_bytes'] is not None])
+        family('events_total', 'counter', "Counted pipeline events.",
+               [({'event': name}, value) for name, value in data['counters'].items()])
+        if data['peak_rss_bytes'] is not None:
+            family('peak_rss_bytes', 'gauge', "Peak resident memory of the process.", [({}, data['peak_rss_bytes'])])
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        """Writes the metrics to `path`: Prometheus text format for a .prom file, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+
+    def report(self):
+        """The stages as a printable table."""
+        data = self.to_dict()
+        lines = [f"{'stage':<18} {'calls':>6} {'seconds':>9} {'items':>8} {'items/s':>9} {'peak MB':>8}"]
+        for name, s in data['stages'].items():
+            rate = f"{s['items_per_second']:.1f}" if s['items_per_second'] else '-'
+            peak = f"{s['peak_rss_bytes'] / 2 ** 20:.0f}" if s['peak_rss_bytes'] else '-'
+            lines.append(f"{name:<18} {s['calls']:>6} {s['seconds']:>9.2f} {s['items']:>8} {rate:>9} {peak:>8}")
+        if data['counters']:
+            lines.append("counters: " + ", ".join(f"{name}={value}" for name, value in data['counters'].items()))
+        return '\n'.join(lines)
+
+
+# The process's metrics, shared by every module
+metrics = Metrics()
@@ -0,0 +1,163 @@
+"""
+Positional inverted index over the speech texts, for the dashboard's keyword queries.
+
+Speeches are split into word tokens (runs of letters and digits, lowercased), and for
+every term the index keeps the speeches it occurs in and its token positions there.
+That answers whole-word and phrase counts ("war" no longer matches "award"; "united
+states" is matched as a phrase) for any set of speeches without rescanning the text,
+and the character offsets of each match, so highlighting doesn't rescan it either.
+
+Analyzer.py builds it next to the corpus store; to build it for an existing store:
+    python keyword_index.py corpus_store
+"""
+import os
+import pickle
+import re
+import sys
+
+import numpy as np
+
+from corpus_store import CorpusStore
+
+INDEX_FILE = 'keyword_index.pkl'
+
+# A word token: letters and digits, so "nation's" is "nation" + "s", for texts and queries alike
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """The lowercased tokens of a query, matched the same way as the indexed texts."""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class KeywordIndex:
+    """
+    Positional inverted index. Tokens are numbered across the whole corpus, speech after
+    speech (speech i has tokens token_ptr[i] to token_ptr[i + 1]), and per term the index
+    keeps its token numbers in ascending order: counts and phrase matches are then a few
+    vectorized searches, however many speeches are asked for. The character offsets of
+    every token turn a match back into a span of the original text.
+    """
+
+    def __init__(self, data_version=None):
+        self.data_version = data_version
+        self.postings = {}
+        self.doc_ids = np.zeros(0, dtype=np.int64)
+        self.token_ptr = np.zeros(1, dtype=np.int64)
+        self.token_starts = np.zeros(0, dtype=np.int32)
+        self.token_ends = np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def build(cls, docs, data_version=None):
+        """Builds the index from (doc_id, text) pairs in ascending doc_id order."""
+        index = cls(data_version)
+        postings = {}
+        doc_ids, token_counts, starts, ends = [], [], [], []
+        for doc_id, text in docs:
+            n = 0
+            for match in TOKEN_PATTERN.finditer(text or ''):
+                postings.setdefault(match.group().lower(), []).append(len(starts))
+                starts.append(match.start())
+                ends.append(match.end())
+                n += 1
+            doc_ids.append(doc_id)
+            token_counts.append(n)
+
+        index.postings = {term: np.array(positions, dtype=np.int64) for term, positions in postings.items()}
+        index.doc_ids = np.array(doc_ids, dtype=np.int64)
+        index.token_ptr = np.concatenate(([0], np.cumsum(token_counts))).astype(np.int64)
+        index.token_starts = np.array(starts, dtype=np.int32)
+        index.token_ends = np.array(ends, dtype=np.int32)
+        return index
+
+    def save(self, path):
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _phrase_starts(self, tokens):
+        """Token numbers where the whole phrase starts, across the corpus (ascending)."""
+        if not tokens or any(token not in self.postings for token in tokens):
+            return np.zeros(0, dtype=np.int64)
+        # Start from the rarest word, so common words only cost a search each
+        anchor = min(range(len(tokens)), key=lambda i: len(self.postings[tokens[i]]))
+        starts = self.postings[tokens[anchor]]
+        if anchor:
+            starts = starts - anchor
+        for offset, token in enumerate(tokens):
+            if offset == anchor or not len(starts):
+                continue
+            following = self.postings[token]
+            i = np.minimum(np.searchsorted(following, starts + offset), len(following) - 1)
+            starts = starts[following[i] == starts + offset]
+        if len(tokens) > 1:
+            # Drop phrases that run across the boundary between two speeches
+            rows = np.searchsorted(self.token_ptr, starts, side='right') - 1
+            starts = starts[(rows >= 0) & (starts + len(tokens) <= self.token_ptr[rows + 1])]
+        return starts
+
+    def _rows(self, doc_ids):
+        """Positions of doc_ids in self.doc_ids."""
+        rows = np.searchsorted(self.doc_ids, doc_ids)
+        if np.any(rows >= len(self.doc_ids)) or np.any(self.doc_ids[np.minimum(rows, len(self.doc_ids) - 1)] != doc_ids):
+            raise KeyError(f"Speeches not in the index: {doc_ids}")
+        return rows
+
+    def counts(self, query, doc_ids=None):
+        """
+        Whole-word / phrase occurrences of `query` per speech, as an array aligned with
+        `doc_ids` (default: every indexed speech, in doc_id order).
+        """
+        starts = self._phrase_starts(tokenize(query))
+        # Matches are sorted, so a speech's count is the distance between its boundaries
+        if doc_ids is None:
+            return np.diff(np.searchsorted(starts, self.token_ptr))
+        rows = self._rows(np.asarray(doc_ids, dtype=np.int64))
+        return np.searchsorted(starts, self.token_ptr[rows + 1]) - np.searchsorted(starts, self.token_ptr[rows])
+
+    def count(self, query, doc_ids=None):
+        """Total occurrences of `query` in the given speeches (default: all)."""
+        return int(self.counts(query, doc_ids).sum())
+
+    def matches(self, query, doc_id):
+        """(start, end) character offsets of every occurrence of `query` in one speech."""
+        tokens = tokenize(query)
+        starts = self._phrase_starts(tokens)
+        row = self._rows(np.array([doc_id], dtype=np.int64))[0]
+        lo, hi = np.searchsorted(starts, [self.token_ptr[row], self.token_ptr[row + 1]])
+        starts = starts[lo:hi]
+        return list(zip(self.token_starts[starts].tolist(), self.token_ends[starts + len(tokens) - 1].tolist()))
+
+
+def build_index(store_dir):
+    """Builds the keyword index of a corpus store and saves it inside the store."""
+    store = CorpusStore(store_dir)
+    index = KeywordIndex.build(store.iter_texts('speech_text'), store.data_version)
+    index.save(os.path.join(store_dir, INDEX_FILE))
+    return index
+
+
+def load_index(store_dir):
+    """The store's keyword index, rebuilt if it is missing or was built from other data."""
+    path = os.path.join(store_dir, INDEX_FILE)
+    if os.path.exists(path):
+        index = KeywordIndex.load(path)
+        if index.data_version == CorpusStore(store_dir).data_version:
+            return index
+    return build_index(store_dir)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python keyword_index.py <store_dir>")
+        exit()
+    # Through the module rather than __main__, so the index is pickled as a keyword_index.KeywordIndex
+    import keyword_index
+    index = keyword_index.build_index(sys.argv[1])
+    print(f"Indexed {len(index.doc_ids)} speeches, {len(index.postings)} terms, "
+          f"{len(index.token_starts)} tokens into {os.path.join(sys.argv[1], INDEX_FILE)}.")
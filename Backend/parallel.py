@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# One instance per worker process, class and config, so resources load once per worker
+_worker_instances = {}
+
+
+def _run_chunk(cls, config, method, items):
+    instance = _worker_instances.get((cls, config))
+    if instance is None:
+        instance = _worker_instances[cls, config] = cls(*config)
+    run = getattr(instance, method)
+    return [run(item) for item in items]
+
+
+def run_chunked(obj, method, items, workers=None, chunksize=16, executor=None):
+    """
+    Calls obj.<method>(item) for every item, spreading chunks of `chunksize` items over
+    a process pool. Each worker builds its own instance from obj.config (the arguments
+    of an identical instance). Pass an existing `executor` to reuse its processes across
+    batches, or `workers=1` to stay in this process. Results are in input order.
+    """
+    items = list(items)
+    if executor is None and workers == 1:
+        run = getattr(obj, method)
+        return [run(item) for item in items]
+
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+    run_chunk = partial(_run_chunk, type(obj), obj.config, method)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_chunk, chunks))
+    else:
+        results = list(executor.map(run_chunk, chunks))
+    return [result for chunk in results for result in chunk]
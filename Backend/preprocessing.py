@@ -1,8 +1,156 @@
 import pandas as pd
+import re
 import string
+import functools
+import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
+from parallel import run_chunked
+
+
+# --- Fast tokenizer ---
+# word_tokenize runs Punkt sentence splitting and then the Treebank rules, but
+# preprocessing keeps only the alphabetic tokens. fast_tokenize produces those same
+# alphabetic tokens with precompiled regex passes over the whole text:
+# 1. Mark periods that don't end a sentence (after an abbreviation or an initial, or
+#    followed by a character like "," or "?") so the word they belong to is dropped,
+#    as word_tokenize leaves them on a non-alphabetic token ("mr.", "etc.,").
+# 2. Replace everything Treebank always splits off (brackets, quotes, ;@#$%&*?!,
+#    dashes, "..." and commas/colons not followed by a digit) with spaces.
+# 3. Find whitespace-delimited words made only of letters, optionally wrapped in an
+#    opening quote, a clitic that Treebank splits off ("n't", "'s", ...) and a
+#    sentence-final period.
+# Anything else (numbers, "u.s.", "well-being", "o'brien") is not alphabetic after
+# word_tokenize either, so it is dropped. benchmarks/compare_tokenizers.py measures
+# how closely this matches word_tokenize on a corpus.
+_FAST_SEPARATORS = re.compile(
+    r"[;@#$%&?!*()\[\]{}<>\"`\u00ab\u00bb\u201c\u201d\u2018\u2019\u201e\u2012-\u2015]|--|\.{2,}|[:,](?!\d)"
+)
+_FAST_TOKEN = re.compile(
+    r"(?<!\S)(?:'(?!(?:re|ve|ll|m|t|s|d|n)\b))?([^\W\d_]+)(n't|'s|'m|'d|'ll|'re|'ve|')?(\.'?)?(?!\S)"
+)
+# Punkt only considers a period a sentence end when whitespace or one of these characters follows it
+_INNER_PERIOD = re.compile(r"(?<=[^\W\d_])\.(?=[^\s)\";}\]*:@'({\[.\u00bb\u201d\u2019])")
+# A whitespace-delimited word ending in a period, with more text after it
+_WORD_BEFORE_SPACE = re.compile(r"(?<!\S)([^\s.]\S*?)\.(?=\s+\S)")
+# Characters Punkt splits off the front of a word
+_WORD_START_PUNCT = "(\"`{[:;&#*@)}]-,"
+# Treebank splits these words in two (CONTRACTIONS2)
+_SPLIT_WORDS = {
+    'cannot': ('can', 'not'), 'gimme': ('gim', 'me'), 'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'), 'lemme': ('lem', 'me'), 'wanna': ('wan', 'na'),
+}
+_abbreviations = None
+
+
+def _load_abbreviations():
+    """
+    Punkt's English abbreviation list ("mr", "u.s", ...). A period after one of these
+    doesn't end a sentence, so word_tokenize keeps it on the token ("mr.").
+    """
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer
+        return frozenset(PunktTokenizer('english')._params.abbrev_types)
+    except (ImportError, LookupError, AttributeError):
+        pass
+    try:
+        import nltk.data
+        return frozenset(nltk.data.load('tokenizers/punkt/english.pickle')._params.abbrev_types)
+    except (LookupError, AttributeError, OSError):
+        return frozenset({'mr', 'mrs', 'ms', 'dr', 'st', 'jr', 'sr', 'gen', 'gov', 'sen', 'rep', 'co', 'inc', 'vs', 'etc'})
+
+
+def _mark_abbreviation(match):
+    word = match.group(1).lstrip(_WORD_START_PUNCT)
+    if word in _abbreviations or (len(word) == 1 and word.isalpha()):
+        return match.group(1) + '.\x00'
+    return match.group(0)
+
+
+def fast_tokenize(text):
+    """
+    Returns the alphabetic tokens word_tokenize would produce for `text`, in order.
+    Like word_tokenize, it doesn't lowercase; Punkt's capitalization heuristics are not
+    modelled, so it is meant for lowercased text.
+    """
+    global _abbreviations
+    if _abbreviations is None:
+        _abbreviations = _load_abbreviations()
+
+    text = _WORD_BEFORE_SPACE.sub(_mark_abbreviation, _INNER_PERIOD.sub('.\x00', text))
+    tokens = []
+    for word, clitic, period in _FAST_TOKEN.findall(_FAST_SEPARATORS.sub(' ', text)):
+        if word in _SPLIT_WORDS:
+            tokens.extend(_SPLIT_WORDS[word])
+        else:
+            tokens.append(word)
+    return tokens
+
+
+TOKENIZERS = {'nltk': word_tokenize, 'fast': fast_tokenize}
+
+
+class Preprocessor:
+    """
+    Reusable text preprocessor.
+    Loads the stopword list and the lemmatizer once, and memoizes token -> lemma
+    lookups in a bounded LRU cache, since political vocabulary repeats a lot.
+    With tokenizer='nltk' (the default) it produces exactly the same output as
+    preprocess_text; tokenizer='fast' swaps word_tokenize for fast_tokenize.
+    """
+
+    def __init__(self, lemma_cache_size=100_000, tokenizer='nltk'):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer {tokenizer!r}, expected one of {sorted(TOKENIZERS)}")
+        self.lemma_cache_size = lemma_cache_size
+        self.tokenizer = tokenizer
+        self.tokenize = TOKENIZERS[tokenizer]
+        self.stop_words = set(stopwords.words('english'))
+        self.punct = string.punctuation
+        self.lemmatizer = WordNetLemmatizer()
+        self.lemmatize = functools.lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
+
+    @property
+    def config(self):
+        """The settings needed to build an identical Preprocessor in a worker process."""
+        return (self.lemma_cache_size, self.tokenizer)
+
+    @property
+    def version(self):
+        """Identifies everything that affects the output, for ResultStore keys."""
+        return f"preprocess-v1/tokenizer={self.tokenizer}/nltk={nltk.__version__}"
+
+    def lemma_cache_info(self):
+        return self.lemmatize.cache_info()
+
+    def process(self, text):
+        """
+        Cleans and preprocesses a single piece of text.
+        - Lowercase
+        - Tokenize
+        - Remove stopwords, punctuation, and numbers
+        - Lemmatize
+        """
+        tokens = self.tokenize(text.lower())
+        stop_words = self.stop_words
+        punct = self.punct
+        lemmatize = self.lemmatize
+        return " ".join(
+            lemmatize(token) for token in tokens
+            if token not in stop_words and token not in punct and token.isalpha()
+        )
+
+    def process_batch(self, texts, workers=None, chunksize=16, executor=None):
+        """
+        Preprocesses many documents, spreading chunks of `chunksize` documents over a
+        process pool. Pass an existing `executor` to reuse its processes across batches,
+        or `workers=1` to stay in this process. Results are in input order.
+        """
+        return run_chunked(self, 'process', texts, workers=workers, chunksize=chunksize, executor=executor)
+
+
+_default_preprocessor = None
 
 
 def preprocess_text(text):
@@ -13,27 +161,11 @@ def preprocess_text(text):
     - Remove stopwords, punctuation, and numbers
     - Lemmatize
     """
-    # 1. Lowercase the text
-    text = text.lower()
-
-    # 2. Tokenize (split text into words)
-    tokens = word_tokenize(text)
-
-    # 3. Setup for cleaning
-    stop_words = set(stopwords.words('english'))
-    punct = string.punctuation
-    lemmatizer = WordNetLemmatizer()
-
-    # 4. Clean tokens
-    cleaned_tokens = []
-    for token in tokens:
-        # Remove stopwords and punctuation
-        if token not in stop_words and token not in punct and token.isalpha():
-            # Lemmatize the token
-            cleaned_tokens.append(lemmatizer.lemmatize(token))
+    global _default_preprocessor
+    if _default_preprocessor is None:
+        _default_preprocessor = Preprocessor()
+    return _default_preprocessor.process(text)
 
-    # 5. Join tokens back into a single string
-    return " ".join(cleaned_tokens)
 
 if __name__ == '__main__':
 
@@ -46,13 +178,13 @@ if __name__ == '__main__':
         print("Please run scraper.py first to generate the data.")
         exit()
 
-    # Apply the preprocessing function to the 'speech_text' column
+    # Preprocess the 'speech_text' column, spread over all CPU cores
     # This might take a minute or two
-    df['cleaned_speech'] = df['speech_text'].apply(preprocess_text)
+    df['cleaned_speech'] = Preprocessor().process_batch(df['speech_text'])
 
     # Save the processed data to a new CSV to avoid re-running this step
     df.to_csv('sotu_speeches_processed.csv', index=False)
 
     print("Data preprocessing complete. Saved to 'sotu_speeches_processed.csv'.")
     print("\nHere's a sample with the new 'cleaned_speech' column:")
-    print(df[['president', 'date', 'cleaned_speech']].head())
\ No newline at end of file
+    print(df[['president', 'date', 'cleaned_speech']].head())
@@ -0,0 +1,197 @@
+"""
+The dashboard's queries over one processed corpus: sentiment and keyword aggregates,
+speeches and their pages, keyword matches, similar speeches and topics.
+
+CorpusQueries loads the corpus store, keyword index and aggregates of a data directory
+once (the similarity index and topic models when first asked for), and answers with
+plain JSON-able values. The app uses it in-process, or, to share one copy between every
+dashboard, through query_service.py with query_client.ServiceClient, which has the same
+methods.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from aggregates import load_aggregates
+from corpus_store import CorpusStore, convert_csv
+from instrumentation import metrics
+from similarity_index import load_similarity_index
+from topic_modeler import TopicModeler
+
+# Speech pages: whole paragraphs, about this many characters each
+PAGE_CHARS = 4000
+
+
+def _records(frame):
+    """A DataFrame as JSON-able records (missing values as None, dates as ISO strings)."""
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+class CorpusQueries:
+    """Queries over the processed corpus in `data_dir`, where Analyzer.py writes its output."""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.store_dir = os.path.join(data_dir, 'corpus_store')
+        self.topic_cache_dir = os.path.join(data_dir, 'topic_cache')
+        if not CorpusStore.exists(self.store_dir):
+            processed_csv = os.path.join(data_dir, 'sotu_speeches_processed.csv')
+            if not os.path.exists(processed_csv):
+                raise FileNotFoundError(f"No corpus store or {processed_csv}; run Analyzer.py first.")
+            with metrics.stage('corpus_store'):
+                convert_csv(processed_csv, self.store_dir)
+
+        with metrics.stage('data_load') as timer:
+            self.store = CorpusStore(self.store_dir)
+            self.data_version = self.store.data_version
+            self.metadata = self.store.metadata().set_index('doc_id', drop=False)
+            self.aggregates = load_aggregates(self.store_dir)
+            self.index = self.aggregates.index
+            timer['items'] = len(self.metadata)
+
+        # Built on first use, once even when asked for by several threads at a time; each
+        # number of topics has its own lock, so fitting one model doesn't hold up the others
+        self._similarity_lock = threading.Lock()
+        self._topic_lock = threading.Lock()
+        self._similarity_index = None
+        self._topic_modeler = None
+        self._topic_models = {}  # num_topics -> fitted LDA model
+        self._model_locks = {}  # num_topics -> lock
+        self._sweep = None
+
+    def info(self):
+        return {'data_version': self.data_version, 'speeches': len(self.metadata)}
+
+    # --- Aggregates ---
+
+    def presidents(self, chronological=False):
+        return self.aggregates.presidents(chronological)
+
+    def stats(self, level, key=None):
+        """Aggregates of every group at `level` (or of one group: a president, year or decade), as records."""
+        frame = self.aggregates.stats(level)
+        if key is not None:
+            frame = frame[frame.index.get_level_values(0).astype(str) == str(key)]
+        return _records(frame.reset_index())
+
+    def term_counts(self, query, level):
+        return _records(self.aggregates.term_counts(query, level).reset_index())
+
+    def term_rates(self, query, level):
+        return _records(self.aggregates.term_rates(query, level).reset_index())
+
+    # --- Speeches ---
+
+    def speeches(self, president):
+        """The president's speeches, oldest first: doc_id, date, year, sentiment_score, url and label."""
+        return _records(self.aggregates.speeches(president))
+
+    def titles(self):
+        """[doc_id, 'President, Month DD, YYYY'] for every speech."""
+        return [[doc_id, f"{president}, {label}"] for president in self.aggregates.presidents()
+                for doc_id, label in self.aggregates.speeches(president)[['doc_id', 'label']].itertuples(index=False)]
+
+    def speech(self, doc_id):
+        """One speech's metadata (president, date, url, sentiment, trajectory, ...)."""
+        return _records(self.metadata.loc[[doc_id]])[0]
+
+    def keyword_counts(self, query, doc_ids):
+        """Whole-word / phrase occurrences of `query` in each of the given speeches."""
+        return self.index.counts(query, doc_ids).tolist()
+
+    def matches(self, query, doc_id):
+        """[start, end] character offsets of every occurrence of `query` in the speech."""
+        return [list(match) for match in self.index.matches(query, doc_id)]
+
+    def _check_speech(self, doc_id):
+        if doc_id not in self.metadata.index:
+            raise KeyError(doc_id)
+
+    def pages(self, doc_id):
+        """[start, end] character offsets of the speech's pages of whole paragraphs."""
+        self._check_speech(doc_id)
+        text = self.store.text(doc_id)
+        pages, start = [], 0
+        while start < len(text):
+            end = text.find('\n', start + PAGE_CHARS)
+            end = len(text) if end == -1 else end + 1
+            pages.append([start, end])
+            start = end
+        return pages or [[0, 0]]
+
+    def page_text(self, doc_id, start, end):
+        self._check_speech(doc_id)
+        return self.store.text_slice(doc_id, start, end)
+
+    # --- Similar speeches ---
+
+    @property
+    def similarity_index(self):
+        if self._similarity_index is None:
+            with self._similarity_lock:
+                if self._similarity_index is None:
+                    self._similarity_index = load_similarity_index(self.store_dir, self.topic_cache_dir)
+        return self._similarity_index
+
+    def similarity_doc_ids(self):
+        """The speeches in the similarity index, in corpus order."""
+        index = self.similarity_index
+        return [doc_id for doc_id in self.metadata['doc_id'].tolist() if doc_id in index]
+
+    def similar(self, doc_id, k=10):
+        """The k most similar speeches, as records: doc_id, similarity, president, year and url."""
+        results = self.similarity_index.similar(doc_id, k)
+        similar = self.metadata.loc[[other for other, _ in results], ['doc_id', 'president', 'year', 'url']]
+        similar.insert(1, 'similarity', [round(score, 3) for _, score in results])
+        return _records(similar)
+
+    def duplicates(self, doc_id, threshold=0.8):
+        """[[doc_id, jaccard]] of the speech's near-duplicates."""
+        return [list(pair) for pair in self.similarity_index.duplicates_of(doc_id, threshold)]
+
+    # --- Topics ---
+
+    @property
+    def topic_modeler(self):
+        if self._topic_modeler is None:
+            with self._topic_lock:
+                if self._topic_modeler is None:
+                    documents = [text for _, text in self.store.iter_texts('cleaned_speech') if text is not None]
+                    self._topic_modeler = TopicModeler(documents, cache_dir=self.topic_cache_dir)
+        return self._topic_modeler
+
+    def topics(self, num_topics, words=10):
+        """
+        The top words of each topic of the LDA model with `num_topics` topics, and its last
+        update. The model is loaded once; after new speeches were added, the previous model
+        is updated with them instead of refitted (see TopicModeler.update_model).
+        """
+        modeler = self.topic_modeler
+        if num_topics not in self._topic_models:
+            with self._topic_lock:
+                lock = self._model_locks.setdefault(num_topics, threading.Lock())
+            with lock:
+                if num_topics not in self._topic_models:
+                    self._topic_models[num_topics], _ = modeler.update_model(num_topics)
+        lda = self._topic_models[num_topics]
+        updates = [r for r in modeler.drift_log() if r['corpus'] == modeler.corpus_hash and r['topics'] == num_topics]
+        return {'topics': modeler.top_words(lda, words), 'update': updates[-1] if updates else None}
+
+    def sweep_results(self):
+        """Model quality per number of topics swept so far, as records."""
+        return [{'topics': k, **scores} for k, scores in sorted(self.topic_modeler.sweep_results().items())]
+
+    def start_sweep(self, low, high):
+        """Fits every number of topics from low to high in a background process (see topic_modeler.py)."""
+        if not self.sweep_running():
+            self._sweep = subprocess.Popen(
+                [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'topic_modeler.py'),
+                 '--store', self.store_dir, '--cache-dir', self.topic_cache_dir, '--sweep', f'{low}-{high}'],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        return True
+
+    def sweep_running(self):
+        return self._sweep is not None and self._sweep.poll() is None
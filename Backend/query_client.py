@@ -0,0 +1,97 @@
+"""
+Client of query_service.py, with the same methods and answers as queries.CorpusQueries,
+so the app can use either: the service when several dashboards share one corpus, or the
+corpus loaded in-process.
+"""
+import requests
+
+
+class ServiceClient:
+    """The corpus queries of the query service at `url` (e.g. http://127.0.0.1:8765)."""
+
+    def __init__(self, url, timeout=600):
+        self.url = url.rstrip('/')
+        # Fitting a topic model the first time can take minutes
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, name, **params):
+        params = {key: ','.join(map(str, value)) if isinstance(value, (list, tuple)) else value
+                  for key, value in params.items() if value is not None}
+        return self._answer(self.session.get(f"{self.url}/api/{name}", params=params, timeout=self.timeout))
+
+    def _post(self, name, **params):
+        return self._answer(self.session.post(f"{self.url}/api/{name}", data=params, timeout=self.timeout))
+
+    @staticmethod
+    def _answer(response):
+        # The same exceptions as the queries raise in-process
+        if response.status_code == 404:
+            raise KeyError(response.text)
+        if response.status_code == 400:
+            raise ValueError(response.text)
+        response.raise_for_status()
+        return response.json()
+
+    def info(self):
+        return self._get('info')
+
+    def status(self):
+        """The service's data version, response cache size and hit counts."""
+        response = self.session.get(f"{self.url}/status", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def presidents(self, chronological=False):
+        return self._get('presidents', chronological=chronological)
+
+    def stats(self, level, key=None):
+        return self._get('stats', level=level, key=key)
+
+    def term_counts(self, query, level):
+        return self._get('term_counts', query=query, level=level)
+
+    def term_rates(self, query, level):
+        return self._get('term_rates', query=query, level=level)
+
+    def speeches(self, president):
+        return self._get('speeches', president=president)
+
+    def titles(self):
+        return self._get('titles')
+
+    def speech(self, doc_id):
+        return self._get('speech', doc_id=doc_id)
+
+    def keyword_counts(self, query, doc_ids):
+        return self._get('keyword_counts', query=query, doc_ids=doc_ids)
+
+    def matches(self, query, doc_id):
+        return self._get('matches', query=query, doc_id=doc_id)
+
+    def pages(self, doc_id):
+        return self._get('pages', doc_id=doc_id)
+
+    def page_text(self, doc_id, start, end):
+        return self._get('page_text', doc_id=doc_id, start=start, end=end)
+
+    def similarity_doc_ids(self):
+        return self._get('similarity_doc_ids')
+
+    def similar(self, doc_id, k=10):
+        return self._get('similar', doc_id=doc_id, k=k)
+
+    def duplicates(self, doc_id, threshold=0.8):
+        return self._get('duplicates', doc_id=doc_id, threshold=threshold)
+
+    def topics(self, num_topics, words=10):
+        return self._get('topics', num_topics=num_topics, words=words)
+
+    def sweep_results(self):
+        return self._get('sweep_results')
+
+    def start_sweep(self, low, high):
+        return self._post('start_sweep', low=low, high=high)
+
+    def sweep_running(self):
+        return self._get('sweep_running')
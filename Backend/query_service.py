@@ -0,0 +1,298 @@
+"""
+Local HTTP query service: one process holds the corpus, its indexes and the fitted topic
+models (see queries.py) and answers the queries of every dashboard pointed at it.
+
+    GET /api/<query>?<params>   a CorpusQueries method, e.g.
+                                /api/term_counts?query=economy&level=president
+                                /api/similar?doc_id=12&k=10
+                                /api/topics?num_topics=10&words=10
+    POST /api/<action>          a CorpusQueries method that changes state, parameters
+                                form-encoded: /api/start_sweep with low=5&high=30
+    GET /status                 data version, cache size and hit counts (JSON)
+    GET /metrics                query timings and counters, Prometheus text format
+    GET /health
+
+Answers are cached as JSON, keyed by data version, query and parameters, in an LRU of at
+most `--cache-mb` megabytes. Identical queries arriving while one is being answered wait
+for that answer instead of computing it again (request coalescing), so e.g. a dozen
+dashboards asking for a model that isn't fitted yet start one fit. Queries run in thread
+pools, off the event loop; those that may fit topic models have a pool of their own
+(`--model-workers`), so cheap queries never queue behind a fit. When Analyzer.py rewrites
+the corpus store, the service loads the new version (checked every `--reload-seconds`)
+and serves the old one meanwhile.
+
+Run from the Backend directory:
+    python query_service.py --data-dir <where Analyzer.py writes> --port 8765
+and start the app with SOTU_SERVICE_URL=http://127.0.0.1:8765.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from aiohttp import web
+
+from byte_lru import ByteLRU
+from corpus_store import MANIFEST_FILE
+from instrumentation import metrics
+from queries import CorpusQueries
+
+
+def _flag(text):
+    return text.lower() in ('1', 'true', 'yes')
+
+
+def _ids(text):
+    return tuple(int(doc_id) for doc_id in text.split(',') if doc_id)
+
+
+# Query parameters and their types
+PARAMS = {
+    'chronological': _flag,
+    'level': str,
+    'key': str,
+    'query': str,
+    'president': str,
+    'doc_id': int,
+    'doc_ids': _ids,
+    'start': int,
+    'end': int,
+    'k': int,
+    'threshold': float,
+    'num_topics': int,
+    'words': int,
+    'low': int,
+    'high': int,
+}
+
+# The CorpusQueries methods served by GET, and whether their answers can be cached (the
+# sweep's change while it runs)
+QUERIES = {
+    'info': True,
+    'presidents': True,
+    'stats': True,
+    'term_counts': True,
+    'term_rates': True,
+    'speeches': True,
+    'titles': True,
+    'speech': True,
+    'keyword_counts': True,
+    'matches': True,
+    'pages': True,
+    'page_text': True,
+    'similarity_doc_ids': True,
+    'similar': True,
+    'duplicates': True,
+    'topics': True,
+    'sweep_results': False,
+    'sweep_running': False,
+}
+
+# The CorpusQueries methods that change state: served by POST, never cached or coalesced
+ACTIONS = {'start_sweep'}
+
+# Queries that may fit topic models (or read every speech to vectorize them): run on their own threads
+MODEL_QUERIES = {'topics', 'sweep_results'}
+
+
+class QueryError(Exception):
+    """A query that can't be answered, with the HTTP status to answer it with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryService:
+    """The corpus queries of `data_dir` over HTTP, with a response cache and request coalescing."""
+
+    def __init__(self, data_dir, cache_mb=256, workers=4, model_workers=2, reload_seconds=30):
+        self.data_dir = data_dir
+        self.reload_seconds = reload_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query')
+        self.model_executor = ThreadPoolExecutor(max_workers=model_workers, thread_name_prefix='model')
+        # Reloads get a thread of their own, so busy query or model threads can't hold them up
+        self.reload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reload')
+        self.queries = CorpusQueries(data_dir)
+        self._manifest_mtime = self._mtime()
+        self._checked = time.monotonic()
+        self._reloading = None
+        self.cache = ByteLRU(cache_mb * 1024 * 1024)  # key -> JSON bytes
+        self.inflight = {}  # key -> task answering it
+
+    def _mtime(self):
+        path = os.path.join(self.queries.store_dir, MANIFEST_FILE)
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    # --- Answering ---
+
+    def _run(self, queries, name, params):
+        """Runs one query (in a worker thread) and returns its JSON."""
+        with metrics.stage(f'query_{name}', items=1):
+            try:
+                result = getattr(queries, name)(**params)
+            except KeyError as e:
+                raise QueryError(404, f"Not found: {e}")
+            except (ValueError, TypeError) as e:
+                raise QueryError(400, str(e))
+        return json.dumps(result).encode('utf-8')
+
+    async def answer(self, name, params):
+        """The JSON answer to a query and how it was answered: 'hit', 'miss' or 'coalesced'."""
+        self._maybe_reload()
+        queries = self.queries
+        key = (queries.data_version, name, tuple(sorted(params.items())))
+
+        body = self.cache.get(key)
+        if body is not None:
+            metrics.count('query_cache_hits')
+            return body, 'hit'
+        if key in self.inflight:
+            metrics.count('query_coalesced')
+            # Shielded, so a client hanging up doesn't cancel the others' answer
+            return await asyncio.shield(self.inflight[key]), 'coalesced'
+
+        metrics.count('query_cache_misses')
+        loop = asyncio.get_running_loop()
+        executor = self.model_executor if name in MODEL_QUERIES else self.executor
+        task = loop.run_in_executor(executor, partial(self._run, queries, name, params))
+        self.inflight[key] = task
+        try:
+            body = await asyncio.shield(task)
+        finally:
+            self.inflight.pop(key, None)
+        # Not if the corpus was reloaded meanwhile: no one asks for the old version anymore
+        if QUERIES[name] and key[0] == self.queries.data_version:
+            for _ in self.cache.put(key, body):
+                metrics.count('query_cache_evictions')
+        return body, 'miss'
+
+    def _maybe_reload(self):
+        """Loads the corpus again in the background once Analyzer.py has rewritten the store."""
+        now = time.monotonic()
+        if self._reloading is not None or now - self._checked < self.reload_seconds:
+            return
+        self._checked = now
+        mtime = self._mtime()
+        if mtime is None or mtime == self._manifest_mtime:
+            return
+        self._reloading = asyncio.get_running_loop().run_in_executor(self.reload_executor, CorpusQueries, self.data_dir)
+        self._reloading.add_done_callback(partial(self._reloaded, mtime))
+
+    def _reloaded(self, mtime, future):
+        self._reloading = None
+        if future.exception() is not None:
+            # E.g. caught halfway through a rewrite; tried again at the next check
+            print(f"Reloading {self.data_dir} failed: {future.exception()}")
+            return
+        self.queries = future.result()
+        self._manifest_mtime = mtime
+        # Answers about the old version can't be asked for anymore
+        self.cache.clear()
+        metrics.count('data_reloads')
+        print(f"Loaded data version {self.queries.data_version}.")
+
+    # --- HTTP ---
+
+    @staticmethod
+    def _params(items):
+        try:
+            return {key: PARAMS[key](value) for key, value in items}
+        except KeyError as e:
+            raise web.HTTPBadRequest(text=f"Unknown parameter: {e}")
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+
+    async def handle_query(self, request):
+        name = request.match_info['name']
+        if name in ACTIONS:
+            raise web.HTTPMethodNotAllowed(request.method, ['POST'])
+        if name not in QUERIES:
+            raise web.HTTPNotFound(text=f"Unknown query: {name}")
+        params = self._params(request.query.items())
+        try:
+            body, how = await self.answer(name, params)
+        except QueryError as e:
+            return web.Response(status=e.status, text=str(e))
+        return web.Response(body=body, content_type='application/json', headers={'X-Cache': how})
+
+    async def handle_action(self, request):
+        name = request.match_info['name']
+        if name in QUERIES:
+            raise web.HTTPMethodNotAllowed(request.method, ['GET'])
+        if name not in ACTIONS:
+            raise web.HTTPNotFound(text=f"Unknown action: {name}")
+        params = self._params((await request.post()).items())
+        loop = asyncio.get_running_loop()
+        try:
+            body = await loop.run_in_executor(self.executor, partial(self._run, self.queries, name, params))
+        except QueryError as e:
+            return web.Response(status=e.status, text=str(e))
+        return web.Response(body=body, content_type='application/json')
+
+    async def handle_status(self, request):
+        counters = metrics.to_dict()['counters']
+        return web.json_response({
+            'data_version': self.queries.data_version,
+            'speeches': len(self.queries.metadata),
+            'cache_entries': len(self.cache),
+            'cache_bytes': self.cache.size,
+            'cache_max_bytes': self.cache.max_bytes,
+            'inflight': len(self.inflight),
+            **{name: counters.get(f'query_{name}', 0) for name in ('cache_hits', 'cache_misses', 'coalesced',
+                                                                    'cache_evictions')},
+        })
+
+    async def handle_metrics(self, request):
+        return web.Response(text=metrics.to_prometheus(), content_type='text/plain')
+
+    async def handle_health(self, request):
+        return web.Response(text='ok')
+
+    def app(self):
+        app = web.Application()
+        app.add_routes([
+            web.get('/api/{name}', self.handle_query),
+            web.post('/api/{name}', self.handle_action),
+            web.get('/status', self.handle_status),
+            web.get('/metrics', self.handle_metrics),
+            web.get('/health', self.handle_health),
+        ])
+        app.on_cleanup.append(self._shutdown)
+        return app
+
+    async def _shutdown(self, app):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.model_executor.shutdown(wait=False, cancel_futures=True)
+        self.reload_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', default=os.environ.get('SOTU_DATA_DIR', '.'),
+                        help="Where Analyzer.py writes its output (default: $SOTU_DATA_DIR, else here)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-mb', type=float, default=256, help="Memory cap of the response cache")
+    parser.add_argument('--workers', type=int, default=4, help="Threads answering queries")
+    parser.add_argument('--model-workers', type=int, default=2, help="Threads fitting topic models")
+    parser.add_argument('--reload-seconds', type=float, default=30,
+                        help="How often to check whether Analyzer.py rewrote the corpus store")
+    args = parser.parse_args()
+
+    try:
+        service = QueryService(args.data_dir, cache_mb=args.cache_mb, workers=args.workers,
+                               model_workers=args.model_workers, reload_seconds=args.reload_seconds)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit()
+    print(f"Serving {len(service.queries.metadata)} speeches (data version {service.queries.data_version}) "
+          f"at http://{args.host}:{args.port}")
+    web.run_app(service.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
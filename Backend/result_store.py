@@ -0,0 +1,96 @@
+import hashlib
+import json
+import sqlite3
+
+# SQLite limits the number of parameters in one query; look keys up in batches
+_BATCH = 500
+
+
+def text_hash(text):
+    """Content hash of a document, used as its cache key."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultStore:
+    """
+    Persistent per-row result store, so Analyzer.py only recomputes new or changed rows.
+
+    Results are keyed by (stage, version, hash of the input text). The version string
+    describes everything that affects a stage's output (its settings, library versions),
+    so changing any of them invalidates that stage's results without touching the others.
+    `stats` counts cache hits and recomputed rows per stage for the run report.
+    """
+
+    def __init__(self, path='analyzer_cache.sqlite'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " stage TEXT NOT NULL, version TEXT NOT NULL, text_hash TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (stage, version, text_hash))"
+        )
+        self.conn.commit()
+        self.stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, stage, version, hashes):
+        """Returns {hash: value} for the hashes that have a stored result."""
+        hashes = list(hashes)
+        found = {}
+        for i in range(0, len(hashes), _BATCH):
+            batch = hashes[i:i + _BATCH]
+            rows = self.conn.execute(
+                f"SELECT text_hash, value FROM results WHERE stage = ? AND version = ?"
+                f" AND text_hash IN ({','.join('?' * len(batch))})",
+                [stage, version, *batch],
+            )
+            found.update((h, json.loads(value)) for h, value in rows)
+        return found
+
+    def put_many(self, stage, version, results):
+        """Stores {hash: value} results (values must be JSON-serializable)."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO results (stage, version, text_hash, value) VALUES (?, ?, ?, ?)",
+            [(stage, version, h, json.dumps(value)) for h, value in results.items()],
+        )
+        self.conn.commit()
+
+    def map(self, stage, version, texts, compute):
+        """
+        Returns compute(texts) in order, but only calls `compute` on the texts without
+        a stored result for this stage and version, and stores what it computes.
+        """
+        texts = list(texts)
+        hashes = [text_hash(text) for text in texts]
+        results = self.get_many(stage, version, set(hashes))
+
+        # Compute each distinct missing text once
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in results and h not in missing:
+                missing[h] = text
+        if missing:
+            computed = dict(zip(missing, compute(list(missing.values()))))
+            self.put_many(stage, version, computed)
+            results.update(computed)
+
+        stats = self.stats.setdefault(stage, {'hits': 0, 'recomputed': 0})
+        recomputed = sum(h in missing for h in hashes)
+        stats['recomputed'] += recomputed
+        stats['hits'] += len(hashes) - recomputed
+        return [results[h] for h in hashes]
+
+    def report(self):
+        """One line per stage: how many rows came from the store and how many were recomputed."""
+        return "\n".join(
+            f"  {stage}: {stats['hits']} cache hits, {stats['recomputed']} recomputed"
+            for stage, stats in self.stats.items()
+        )
@@ -1,163 +1,273 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time # To not overwhelm the server
-import re
+import argparse
+import json
+import os
 import csv
 import openpyxl
-
-print("Starting the scraping process...")
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from fetcher import Fetcher
+from http_cache import HTTPCache
+from speech_parser import parse_speech
+from instrumentation import metrics
 
 # The main page with the list of all State of the Union addresses
 BASE_URL = "https://www.presidency.ucsb.edu"
-SOTU_LIST_URL = BASE_URL + "/documents/presidential-documents-archive-guidebook/annual-messages-congress-the-state-the-union"
-
-# Step 1: Get the main page content
+SOTU_LIST_PATH = "/documents/presidential-documents-archive-guidebook/annual-messages-congress-the-state-the-union"
+SOTU_LIST_URL = BASE_URL + SOTU_LIST_PATH
 
 # Identifying the user-agent
 HEADERS = {
     'User-Agent': 'SOTU Scraper Bot (Educational Project) - Contact: <EMAIL>'
 }
 
-
-try:
-    response = requests.get(SOTU_LIST_URL, headers=HEADERS)
-    response.raise_for_status() # This will raise an error for bad responses (4xx or 5xx)
-except requests.exceptions.RequestException as e:
-    print(f"Error fetching list page: {e}")
-    exit()
-
-soup = BeautifulSoup(response.content, 'html.parser')
-
-# Step 2: Find all the links to individual speeches
-# By inspecting the website's HTML, we see speech links are in <td> tags with class 'views-field-title'
-sotu_table = soup.find('table', class_='table-responsive')
-
-if not sotu_table:
-    print("Error: Could not find the main SOTU table on the page. The website structure may have changed.")
-    exit()
-
-
-speech_links = []
-# Find all 'a' (anchor) tags within that specific table
-all_links_in_table = sotu_table.find_all('a')
-# Find all table rows, because each row corresponds to one speech
-table_rows = soup.find_all('tr')
-
-for row in table_rows:
-    # Look for the cell containing the title and link
-    title_cells = row.find_all('td')
-    for title_cell in title_cells:
-        # Looking for links in this cell:
-        link_tag = title_cell.find('a')
-        if link_tag and 'href' in link_tag.attrs:
-            link = link_tag['href']
-            # If link is relative, prepend BASE url.
-            if link.startswith('/'):
-                speech_links.append(BASE_URL + link)
-            else:
-                speech_links.append(link)
-
-
-print(f"Found {len(speech_links)} speech links.")
-
-# Step 3 & 4: Visit each speech link and extract the data
-all_speeches_data = []
-for i, url in enumerate(speech_links):
-    # Give a status update
-    print(f"Scraping speech {i + 1}/{len(speech_links)}: {url}")
-
-    try:
-        speech_response = requests.get(url)
-        speech_response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"  -> Could not fetch {url}. Error: {e}. Skipping.")
-        continue
-
-    speech_soup = BeautifulSoup(speech_response.content, 'html.parser')
-
-    # --- MODIFICATION START ---
-    # By inspecting the HTML, all relevant content is inside <div class="col-sm-8">
-    # We will search within this container to make our selectors more reliable.
-    main_content = speech_soup.find('div', class_='col-sm-8')
-
-    if not main_content:
-        print(f"  -> Could not find main content block on {url}. Skipping.")
-        continue
-
-    try:
-        # The president's name is in an h3 tag with class 'diet-title' within the main content
-        president_tag = main_content.find('h3', class_='diet-title')
-        if president_tag and president_tag.find('a'):
-            president_name = president_tag.find('a').text.strip()
-        else:
-            # Fallback for pages that might have a different structure
-            president_name_container = main_content.find('div', class_='field-docs-person')
-            if president_name_container:
-                 president_name = president_name_container.text.strip()
-            else:
-                 president_name = "Unknown"
-
-        # The date is in a specific div within the main content
-        date_div = main_content.find('div', class_='field-docs-start-date-time')
-        if date_div and date_div.find('span', class_='date-display-single'):
-            date_str = date_div.find('span', class_='date-display-single').text.strip()
-        else:
-            date_str = "Unknown"
-
-        # The speech text is in a div with class 'field-docs-content' within the main content
-        speech_content_div = main_content.find('div', class_='field-docs-content')
-        if speech_content_div:
-            # --- MODIFICATION START ---
-            # Get the raw text first
-            raw_text = speech_content_div.get_text(separator='\n', strip=True)
-
-            # 1. Remove all bracketed annotations like [Applause], [Laughter], etc.
-            #    The re.DOTALL flag ensures that this works even if brackets span multiple lines.
-            cleaned_text = re.sub(r'\[.*?\]', '', raw_text, flags=re.DOTALL)
-
-            # 2. Remove speaker attribution lines like "The President.", "Audience members.", etc.
-            #    This looks for lines that start with common attribution words.
-            #    The re.MULTILINE flag makes ^ and $ match the start/end of lines, not just the whole string.
-            cleaned_text = re.sub(r'^\s*.*?(?:President|Speaker|Representative|Audience members?|Rep\.|Senator)\s*\..*$\n?', '', cleaned_text, flags=re.MULTILINE)
-
-            # 3. Clean up any excess newlines that might result from the above steps
-            speech_text = re.sub(r'\n\s*\n', '\n', cleaned_text).strip()
-        else:
-            speech_text = "Content not found."
-
-        all_speeches_data.append({
-            'president': president_name,
-            'date': date_str,
-            'url': url,
-            'speech_text': speech_text
-        })
-
-    except AttributeError as e:
-        print(f"  -> Could not parse data from {url}. Maybe the page structure is different. Error: {e}. Skipping.")
-        continue  # Skip this speech if we can't parse it
-    # --- MODIFICATION END ---
-
-    # Be polite: wait for a short time between requests
-    time.sleep(0.5)
-
-# Step 5: Save to a DataFrame and then a CSV file
-df = pd.DataFrame(all_speeches_data)
-
-df['president'] = df['president'].str.replace(r'\s*\d+.*President of the United States.*', '', regex=True).str.strip()
-
-# Convert the 'date' column to a proper datetime format
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
-
-# Sort by date to have a chronological record
-df = df.sort_values(by='date').reset_index(drop=True)
-
-# Save the data so we don't have to scrape again!
-df.to_csv('sotu_speeches.csv', index=False, encoding='utf-8-sig', quoting=csv.QUOTE_ALL)
-df.to_excel("sotu_speeches.xlsx", index=False, engine='openpyxl')
-
-print("\nScraping complete!")
-print(f"Successfully saved {len(df)} speeches to sotu_speeches.csv")
-print("\nHere's a sample of the data:")
-print(df.head())
-print(df.tail())
\ No newline at end of file
+# Fetch settings: pages are downloaded concurrently over pooled connections,
+# but never faster than REQUESTS_PER_SECOND per host, to not overwhelm the server
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 2.0
+# Pages are parsed in separate processes, so parsing never holds up the network threads
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Output files, the persistent HTTP cache and the checkpoint journal of a crawl in progress
+OUTPUT_CSV = 'sotu_speeches.csv'
+OUTPUT_XLSX = 'sotu_speeches.xlsx'
+CACHE_DIR = '.http_cache'
+JOURNAL_PATH = 'scrape_journal.jsonl'
+
+
+class ScrapeJournal:
+    """
+    Append-only checkpoint journal of a crawl in progress.
+    Every successfully parsed speech is written as one JSON line and flushed,
+    so a crashed crawl can resume with the speeches it already has.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+
+    def load(self):
+        """
+        Returns the records journaled by a previous, unfinished run. Lines that can't be
+        read (cut short by a crash mid-write) are skipped, and the journal is rewritten
+        without them, so the next appends don't continue a partial line.
+        """
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        damaged = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    damaged = True
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    damaged = True
+        if damaged:
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(record) + '\n' for record in records)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.path + '.tmp', self.path)
+        return records
+
+    def append(self, record):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def resume_crawl(journal, speech_links):
+    """
+    The records of `speech_links` that an unfinished run already journaled, and the
+    links that still need to be fetched, in their original order.
+    """
+    wanted_urls = set(speech_links)
+    records = [r for r in journal.load() if r['url'] in wanted_urls]
+    done_urls = {r['url'] for r in records}
+    return records, [url for url in speech_links if url not in done_urls]
+
+
+def get_speech_links(fetcher, base_url=BASE_URL):
+    """Fetches the list page and returns the links to all individual speeches."""
+    response = fetcher.fetch(base_url + SOTU_LIST_PATH)
+    if not response.ok:
+        print(f"Error fetching list page: {response.error}")
+        return None
+
+    soup = BeautifulSoup(response.content, 'html.parser')
+
+    # By inspecting the website's HTML, we see speech links are in <td> tags with class 'views-field-title'
+    sotu_table = soup.find('table', class_='table-responsive')
+
+    if not sotu_table:
+        print("Error: Could not find the main SOTU table on the page. The website structure may have changed.")
+        return None
+
+    speech_links = []
+    # Find all table rows, because each row corresponds to one speech
+    table_rows = soup.find_all('tr')
+
+    for row in table_rows:
+        # Look for the cell containing the title and link
+        title_cells = row.find_all('td')
+        for title_cell in title_cells:
+            # Looking for links in this cell:
+            link_tag = title_cell.find('a')
+            if link_tag and 'href' in link_tag.attrs:
+                link = link_tag['href']
+                # If link is relative, prepend BASE url.
+                if link.startswith('/'):
+                    speech_links.append(base_url + link)
+                else:
+                    speech_links.append(link)
+    return speech_links
+
+
+def parse_timed(url, content):
+    """parse_speech, with its time, for the parse pool: the parent process records it."""
+    start = time.perf_counter()
+    record = parse_speech(url, content)
+    return record, time.perf_counter() - start
+
+
+def build_dataframe(records):
+    """Turns scraped records into a clean, chronologically sorted DataFrame."""
+    df = pd.DataFrame(records, columns=['president', 'date', 'url', 'speech_text'])
+
+    df['president'] = df['president'].str.replace(r'\s*\d+.*President of the United States.*', '', regex=True).str.strip()
+
+    # Convert the 'date' column to a proper datetime format
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+
+    # Sort by date to have a chronological record
+    return df.sort_values(by='date').reset_index(drop=True)
+
+
+def load_existing_dataset(path=OUTPUT_CSV):
+    """Loads a previously saved dataset, or returns None if there is none."""
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape State of the Union addresses from The American Presidency Project.")
+    parser.add_argument('--new-only', action='store_true',
+                        help="Only fetch speeches missing from the existing sotu_speeches.csv and merge them in.")
+    parser.add_argument('--no-cache', action='store_true', help="Don't use the on-disk HTTP cache.")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore the checkpoint journal of an unfinished crawl and start over.")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND, help="Maximum requests per second.")
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS, help="Processes used to parse pages.")
+    parser.add_argument('--base-url', default=BASE_URL, help="Site to scrape (e.g. a local stand-in server).")
+    parser.add_argument('--metrics', help="Write stage timings and counters here (JSON, or Prometheus for .prom).")
+    args = parser.parse_args()
+
+    print("Starting the scraping process...")
+
+    cache = None if args.no_cache else HTTPCache(CACHE_DIR)
+    fetcher = Fetcher(headers=HEADERS, workers=args.workers, rate=args.rate, cache=cache)
+
+    # Step 1 & 2: Get the main page and find all the links to individual speeches
+    with metrics.stage('fetch_list', items=1):
+        speech_links = get_speech_links(fetcher, args.base_url)
+    if speech_links is None:
+        fetcher.close()
+        exit()
+    print(f"Found {len(speech_links)} speech links.")
+
+    # In "new documents only" mode, skip every speech that is already in the dataset
+    existing_df = None
+    if args.new_only:
+        existing_df = load_existing_dataset()
+        if existing_df is not None:
+            known_urls = set(existing_df['url'])
+            speech_links = [url for url in speech_links if url not in known_urls]
+            print(f"{len(known_urls)} speeches already saved, {len(speech_links)} new.")
+
+    # Resume a crashed crawl: speeches in the journal don't need to be fetched again
+    journal = ScrapeJournal()
+    if args.restart:
+        journal.clear()
+    all_speeches_data, pending_links = resume_crawl(journal, speech_links)
+    if all_speeches_data:
+        print(f"Resuming: {len(all_speeches_data)} speeches recovered from {journal.path}.")
+
+    # Step 3 & 4: Visit each remaining speech link (concurrently) and hand each page to the
+    # parse pool as soon as it arrives. Each speech is journaled as soon as it is parsed.
+    def collect(futures, timeout=None):
+        done, pending = wait(futures, timeout=timeout)
+        for future in done:
+            record, seconds = future.result()
+            metrics.add('parse', seconds, items=1)
+            if record is not None:
+                journal.append(record)
+                all_speeches_data.append(record)
+        return pending
+
+    parse_futures = set()
+    # The fetch stage is the whole crawl (network and rate limiting, overlapping with the
+    # parse pool); parse is the time the pool spent parsing
+    with ProcessPoolExecutor(max_workers=args.parse_workers) as parse_pool, \
+            metrics.stage('fetch', items=len(pending_links)):
+        for i, speech_response in fetcher.iter_fetch(pending_links):
+            url = speech_response.url
+            source = "cache" if speech_response.from_cache else "web"
+            print(f"Scraping speech {i + 1}/{len(pending_links)} ({source}): {url}")
+            metrics.count('pages_from_cache' if speech_response.from_cache else 'pages_from_web')
+            metrics.count('fetch_retries', max(speech_response.attempts - 1, 0))
+
+            if not speech_response.ok:
+                print(f"  -> Could not fetch {url}. Error: {speech_response.error}. Skipping.")
+                metrics.count('fetch_errors')
+                continue
+
+            parse_futures.add(parse_pool.submit(parse_timed, url, speech_response.content))
+            # Journal whatever has finished parsing so far, without waiting for the rest
+            parse_futures = collect(parse_futures, timeout=0)
+        collect(parse_futures)
+    fetcher.close()
+
+    # Keep the original link order before sorting by date
+    link_order = {url: i for i, url in enumerate(speech_links)}
+    all_speeches_data.sort(key=lambda r: link_order[r['url']])
+
+    # Step 5: Save to a DataFrame and then a CSV file
+    df = build_dataframe(all_speeches_data)
+    if existing_df is not None:
+        df = pd.concat([existing_df, df], ignore_index=True)
+        df = df.sort_values(by='date').reset_index(drop=True)
+
+    # Save the data so we don't have to scrape again!
+    with metrics.stage('save', items=len(df)):
+        df.to_csv(OUTPUT_CSV, index=False, encoding='utf-8-sig', quoting=csv.QUOTE_ALL)
+        df.to_excel(OUTPUT_XLSX, index=False, engine='openpyxl')
+
+    # The dataset is safely on disk, so the checkpoint is no longer needed
+    journal.clear()
+
+    print("\nScraping complete!")
+    print(f"Successfully saved {len(df)} speeches to {OUTPUT_CSV}")
+    print("\nHere's a sample of the data:")
+    print(df.head())
+    print(df.tail())
+
+    print("\nStage timings:")
+    print(metrics.report())
+    if args.metrics:
+        metrics.save(args.metrics)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import json
+from importlib.metadata import version, PackageNotFoundError
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from parallel import run_chunked
+
+SEGMENT_MODES = ('paragraph', 'sentence')
+
+try:
+    VADER_VERSION = version('vaderSentiment')
+except PackageNotFoundError:
+    VADER_VERSION = 'unknown'
+
+# Columns written next to 'sentiment_score', in order
+SENTIMENT_COLUMNS = [
+    'sentiment_score', 'sentiment_mean', 'sentiment_min', 'sentiment_max',
+    'sentiment_trajectory', 'sentiment_segments',
+]
+
+
+class SentimentEngine:
+    """
+    Reusable VADER sentiment engine.
+    Loads the lexicon once, and scores each speech both as a whole (the existing
+    'sentiment_score') and segment by segment (paragraphs or sentences), with a roll-up:
+    - sentiment_mean / min / max: over the segment scores
+    - sentiment_trajectory: the segment scores averaged into `trajectory_points`
+      equal slices of the speech, for plotting sentiment over its course
+    - sentiment_segments: every segment score, in order
+    The trajectory and segments are stored as JSON lists so they fit in a CSV cell.
+    """
+
+    def __init__(self, segment='paragraph', trajectory_points=10):
+        if segment not in SEGMENT_MODES:
+            raise ValueError(f"Unknown segment mode {segment!r}, expected one of {SEGMENT_MODES}")
+        self.segment = segment
+        self.trajectory_points = trajectory_points
+        self.analyzer = SentimentIntensityAnalyzer()
+
+    @property
+    def config(self):
+        """The settings needed to build an identical engine in a worker process."""
+        return (self.segment, self.trajectory_points)
+
+    @property
+    def version(self):
+        """Identifies everything that affects the output, for ResultStore keys."""
+        return f"sentiment-v1/segment={self.segment}/points={self.trajectory_points}/vader={VADER_VERSION}"
+
+    def score(self, text):
+        """The VADER compound score of a whole text, -1 (most negative) to +1 (most positive)."""
+        return self.analyzer.polarity_scores(text)['compound']
+
+    def split(self, text):
+        """Splits a speech into the segments that are scored separately."""
+        if self.segment == 'sentence':
+            from nltk.tokenize import sent_tokenize
+            return sent_tokenize(text)
+        # scraper.py writes one paragraph per line
+        return [line for line in text.split('\n') if line.strip()]
+
+    def trajectory(self, segment_scores):
+        """Averages the segment scores into at most `trajectory_points` equal slices."""
+        n = len(segment_scores)
+        points = min(self.trajectory_points, n)
+        trajectory = []
+        for i in range(points):
+            part = segment_scores[i * n // points:(i + 1) * n // points]
+            trajectory.append(round(sum(part) / len(part), 4))
+        return trajectory
+
+    def analyze(self, text):
+        """Scores one speech. Returns a dict with the SENTIMENT_COLUMNS."""
+        segment_scores = [round(self.score(segment), 4) for segment in self.split(text)]
+        return {
+            'sentiment_score': self.score(text),
+            'sentiment_mean': sum(segment_scores) / len(segment_scores) if segment_scores else None,
+            'sentiment_min': min(segment_scores) if segment_scores else None,
+            'sentiment_max': max(segment_scores) if segment_scores else None,
+            'sentiment_trajectory': json.dumps(self.trajectory(segment_scores)),
+            'sentiment_segments': json.dumps(segment_scores),
+        }
+
+    def analyze_batch(self, texts, workers=None, chunksize=8, executor=None):
+        """
+        Scores many speeches, spreading chunks of `chunksize` speeches over a process pool.
+        Pass an existing `executor` to reuse its processes, or `workers=1` to stay in this
+        process. Results are in input order.
+        """
+        return run_chunked(self, 'analyze', texts, workers=workers, chunksize=chunksize, executor=executor)
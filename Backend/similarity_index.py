@@ -0,0 +1,207 @@
+"""
+Speech similarity index: "find speeches like this one" and near-duplicate detection.
+
+- Similar speeches: cosine similarity of the TF-IDF vectors that topic_modeler.py
+  already computes (and caches). Random-hyperplane LSH narrows each query to the
+  speeches sharing a hash bucket with it in any of `n_tables` tables (probing the
+  neighbouring buckets too), and only those candidates are scored exactly; so a query
+  doesn't score every speech, however large the corpus grows.
+- Near duplicates: MinHash signatures of each speech's word 5-grams, banded so that only
+  speeches agreeing on a whole band are compared; pairs whose estimated Jaccard
+  similarity passes the threshold are reported (the same address scraped twice, a
+  message also delivered as a speech, ...).
+
+Analyzer.py builds it next to the corpus store; to build it for an existing store:
+    python similarity_index.py corpus_store
+"""
+import os
+import pickle
+import sys
+import zlib
+
+import numpy as np
+
+from corpus_store import CorpusStore
+from topic_modeler import TopicModeler
+
+SIMILARITY_FILE = 'similarity_index.pkl'
+
+# MinHash: hash functions (a * x + b) mod a prime above 2**32; a < 2**31 keeps a * x in uint64
+_PRIME = np.uint64(4294967311)
+SHINGLE_SIZE = 5
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """32-bit hashes of the text's word `size`-grams."""
+    words = text.split()
+    grams = {' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1 if words else 0))}
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity LSH over a (row-normalized) TF-IDF matrix, plus MinHash signatures
+    of the same speeches. Rows of `matrix` are the speeches `doc_ids`, in order.
+    """
+
+    def __init__(self, matrix, doc_ids, documents=None, n_tables=10, n_bits=None, num_perm=64, bands=16,
+                 seed=0, data_version=None):
+        self.data_version = data_version
+        self.matrix = matrix.tocsr()
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        self._rows = {doc_id: row for row, doc_id in enumerate(self.doc_ids.tolist())}
+        rng = np.random.default_rng(seed)
+
+        # Cosine LSH: one bit per random hyperplane, n_bits bits per table; by default
+        # about 8 speeches per bucket
+        n_docs = self.matrix.shape[0]
+        self.n_tables = n_tables
+        self.n_bits = n_bits or int(np.clip(round(np.log2(max(n_docs, 1) / 8)), 4, 16))
+        self.planes = rng.standard_normal((self.matrix.shape[1], n_tables * self.n_bits))
+        codes = self._codes(self.matrix)
+        self.tables = []
+        for table_codes in codes.T:
+            order = np.argsort(table_codes, kind='stable')
+            keys, starts = np.unique(table_codes[order], return_index=True)
+            self.tables.append(dict(zip(keys.tolist(), np.split(order, starts[1:]))))
+
+        # MinHash with banding: `bands` bands of num_perm // bands rows each
+        self.num_perm, self.bands = num_perm, bands
+        self.perm_a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)
+        self.perm_b = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint64)
+        self.signatures = self.band_buckets = None
+        if documents is not None:
+            self.signatures = np.array([self._minhash(text) for text in documents], dtype=np.uint64)
+            rows_per_band = num_perm // bands
+            has_shingles = ~(self.signatures == _PRIME).all(axis=1)
+            self.band_buckets = []
+            for band in range(bands):
+                buckets = {}
+                keys = self.signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+                for row in np.flatnonzero(has_shingles).tolist():
+                    buckets.setdefault(keys[row].tobytes(), []).append(row)
+                self.band_buckets.append(buckets)
+
+    def _codes(self, matrix):
+        """The bucket of each row in each table, as an (n_rows, n_tables) array of ints."""
+        bits = np.asarray(matrix @ self.planes) > 0
+        weights = 1 << np.arange(self.n_bits)
+        return bits.reshape(bits.shape[0], self.n_tables, self.n_bits) @ weights
+
+    def _minhash(self, text):
+        hashes = shingles(text or '')
+        if not len(hashes):
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((self.perm_a[:, None] * hashes[None, :] + self.perm_b[:, None]) % _PRIME).min(axis=1)
+
+    def save(self, path):
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    # --- Similar speeches ---
+
+    def candidates(self, vector):
+        """Rows sharing a bucket (or a bucket one bit away) with `vector` in any table."""
+        code = self._codes(vector)[0]
+        probes = [0] + [1 << bit for bit in range(self.n_bits)]
+        found = [table[key] for table, c in zip(self.tables, code.tolist())
+                 for key in (c ^ flip for flip in probes) if key in table]
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def query(self, vector, k=10, exclude=None, exact=False):
+        """
+        The k speeches most similar to a TF-IDF row vector, as [(doc_id, cosine)], best
+        first. `exact` scores every speech (also used when LSH finds fewer than k).
+        """
+        rows = np.arange(self.matrix.shape[0]) if exact else self.candidates(vector)
+        if exclude is not None:
+            rows = rows[rows != exclude]
+        if len(rows) < k and not exact:
+            return self.query(vector, k, exclude, exact=True)
+        scores = np.asarray((self.matrix[rows] @ vector.T).todense()).ravel()
+        top = np.argsort(-scores, kind='stable')[:k]
+        return [(int(self.doc_ids[rows[i]]), float(scores[i])) for i in top]
+
+    def similar(self, doc_id, k=10, exact=False):
+        """The k speeches most similar to an indexed one, as [(doc_id, cosine)]."""
+        row = self._rows[doc_id]
+        return self.query(self.matrix[row], k, exclude=row, exact=exact)
+
+    # --- Near duplicates ---
+
+    def _band_keys(self, row):
+        rows_per_band = self.num_perm // self.bands
+        return [self.signatures[row, band * rows_per_band:(band + 1) * rows_per_band].tobytes()
+                for band in range(self.bands)]
+
+    def duplicates_of(self, doc_id, threshold=0.8):
+        """Speeches that are near-duplicates of an indexed one, as [(doc_id, jaccard)], closest first."""
+        row = self._rows[doc_id]
+        # Candidates agree with the speech on at least one whole band
+        others = {other for buckets, key in zip(self.band_buckets, self._band_keys(row))
+                  for other in buckets.get(key, ()) if other != row}
+        others = np.array(sorted(others), dtype=np.int64)
+        if not len(others):
+            return []
+        # The fraction of agreeing MinHash values estimates the Jaccard similarity
+        similarity = (self.signatures[others] == self.signatures[row]).mean(axis=1)
+        keep = similarity >= threshold
+        return sorted(((int(self.doc_ids[o]), float(s)) for o, s in zip(others[keep], similarity[keep])),
+                      key=lambda pair: -pair[1])
+
+    def near_duplicates(self, threshold=0.8):
+        """Every near-duplicate pair in the corpus, as [(doc_id, doc_id, jaccard)]."""
+        candidates = set()
+        for buckets in self.band_buckets:
+            for rows in buckets.values():
+                candidates.update((a, b) for i, a in enumerate(rows) for b in rows[i + 1:])
+        pairs = []
+        for a, b in sorted(candidates):
+            similarity = float((self.signatures[a] == self.signatures[b]).mean())
+            if similarity >= threshold:
+                pairs.append((int(self.doc_ids[a]), int(self.doc_ids[b]), similarity))
+        return pairs
+
+
+def build_similarity_index(store_dir, topic_cache_dir='topic_cache'):
+    """Builds the similarity index of a corpus store and saves it inside the store."""
+    store = CorpusStore(store_dir)
+    docs = [(doc_id, text) for doc_id, text in store.iter_texts('cleaned_speech') if text is not None]
+    # The same documents, so the same cached TF-IDF matrix, as the topic models (not cached
+    # here when the corpus grew, which would keep update_model() from updating their models)
+    modeler = TopicModeler([text for _, text in docs], cache_dir=topic_cache_dir)
+    index = SimilarityIndex(modeler.tfidf_matrix(), [doc_id for doc_id, _ in docs], [text for _, text in docs],
+                            data_version=store.data_version)
+    index.save(os.path.join(store_dir, SIMILARITY_FILE))
+    return index
+
+
+def load_similarity_index(store_dir, topic_cache_dir='topic_cache'):
+    """The store's similarity index, rebuilt if it is missing or was built from other data."""
+    path = os.path.join(store_dir, SIMILARITY_FILE)
+    if os.path.exists(path):
+        index = SimilarityIndex.load(path)
+        if index.data_version == CorpusStore(store_dir).data_version:
+            return index
+    return build_similarity_index(store_dir, topic_cache_dir)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python similarity_index.py <store_dir>")
+        exit()
+    import similarity_index
+    index = similarity_index.build_similarity_index(sys.argv[1])
+    print(f"Indexed {len(index.doc_ids)} speeches ({index.n_tables} LSH tables of {index.n_bits} bits) "
+          f"into {os.path.join(sys.argv[1], SIMILARITY_FILE)}.")
+    for a, b, similarity in index.near_duplicates():
+        print(f"  Near-duplicates: {a} and {b} (Jaccard ~{similarity:.2f})")
@@ -0,0 +1,84 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml is a much faster tree builder than the pure-Python 'html.parser'; use it when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# All relevant content is inside <div class="col-sm-8">. Telling BeautifulSoup to only build
+# that subtree skips the navigation, sidebar, scripts and footer of every page.
+MAIN_CONTENT = SoupStrainer('div', class_='col-sm-8')
+
+# The text cleaners, compiled once instead of on every page
+# 1. Bracketed annotations like [Applause], [Laughter], even if they span multiple lines
+BRACKET_ANNOTATIONS = re.compile(r'\[.*?\]', flags=re.DOTALL)
+# 2. Speaker attribution lines like "The President.", "Audience members.", etc.
+SPEAKER_ATTRIBUTIONS = re.compile(
+    r'^\s*.*?(?:President|Speaker|Representative|Audience members?|Rep\.|Senator)\s*\..*$\n?', flags=re.MULTILINE
+)
+# 3. Excess blank lines left over by the two steps above
+BLANK_LINES = re.compile(r'\n\s*\n')
+
+
+def clean_speech_text(raw_text):
+    """Removes annotations, speaker attributions and blank lines from raw speech text."""
+    cleaned_text = BRACKET_ANNOTATIONS.sub('', raw_text)
+    cleaned_text = SPEAKER_ATTRIBUTIONS.sub('', cleaned_text)
+    return BLANK_LINES.sub('\n', cleaned_text).strip()
+
+
+def parse_speech(url, content, parser=HTML_PARSER):
+    """
+    Extracts president, date and cleaned speech text from a speech page.
+    Returns a record dict, or None if the page doesn't have the expected structure.
+    """
+    speech_soup = BeautifulSoup(content, parser, parse_only=MAIN_CONTENT)
+    main_content = speech_soup.find('div', class_='col-sm-8')
+
+    if not main_content:
+        print(f"  -> Could not find main content block on {url}. Skipping.")
+        return None
+
+    try:
+        # The president's name is in an h3 tag with class 'diet-title' within the main content
+        president_tag = main_content.find('h3', class_='diet-title')
+        president_link = president_tag.find('a') if president_tag else None
+        if president_link:
+            president_name = president_link.text.strip()
+        else:
+            # Fallback for pages that might have a different structure
+            president_name_container = main_content.find('div', class_='field-docs-person')
+            president_name = president_name_container.text.strip() if president_name_container else "Unknown"
+
+        # The date is in a specific div within the main content
+        date_div = main_content.find('div', class_='field-docs-start-date-time')
+        date_span = date_div.find('span', class_='date-display-single') if date_div else None
+        date_str = date_span.text.strip() if date_span else "Unknown"
+
+        # The speech text is in a div with class 'field-docs-content' within the main content
+        speech_content_div = main_content.find('div', class_='field-docs-content')
+        if speech_content_div:
+            speech_text = clean_speech_text(speech_content_div.get_text(separator='\n', strip=True))
+        else:
+            speech_text = "Content not found."
+
+    except AttributeError as e:
+        print(f"  -> Could not parse data from {url}. Maybe the page structure is different. Error: {e}. Skipping.")
+        return None
+
+    return {
+        'president': president_name,
+        'date': date_str,
+        'url': url,
+        'speech_text': speech_text
+    }
+
+
+def parse_pages(urls, contents, workers=None, chunksize=4):
+    """Parses many pages in a process pool. Returns the records (or None) in input order."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_speech, urls, contents, chunksize=chunksize))
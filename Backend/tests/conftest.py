@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The Backend modules import each other by bare name, as when run from the Backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The app's chart cache, which is tested with them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'Frontend'))
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from aggregates import build_aggregates
+from corpus_store import convert_csv
+
+
+def test_undated_speech(tmp_path):
+    csv_path = tmp_path / 'sotu_speeches_processed.csv'
+    pd.DataFrame({
+        'president': ['Washington', 'Washington', 'Adams'],
+        'date': ['January 8, 1790', 'Unknown', 'November 22, 1797'],
+        'url': ['a', 'b', 'c'],
+        'speech_text': ['war and peace', 'war war', 'peace'],
+        'cleaned_speech': ['war peace', 'war war', 'peace'],
+        'sentiment_score': [0.5, -0.5, 0.1],
+    }).to_csv(csv_path, index=False)
+    store_dir = str(tmp_path / 'corpus_store')
+    convert_csv(str(csv_path), store_dir)
+
+    cube = build_aggregates(store_dir)
+    # The undated speech counts for its president, but in no year or decade
+    assert cube.stats('president', 'Washington')['speeches'] == 2
+    assert cube.term_counts('war', 'president')['Washington'] == 3
+    assert cube.term_counts('war', 'year').sum() == 1
+    assert cube.term_counts('war', 'decade').sum() == 1
+    assert cube.speeches('Washington')['label'].tolist() == ['January 08, 1790', 'Unknown date']
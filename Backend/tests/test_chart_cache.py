@@ -0,0 +1,36 @@
+from matplotlib.figure import Figure
+
+from chart_cache import ChartCache
+
+
+def draw(n):
+    def draw():
+        fig = Figure(figsize=(2, 2))
+        fig.subplots().plot(range(n))
+        return fig
+    return draw
+
+
+def test_hits_and_eviction():
+    png, info = ChartCache().get(('probe', 1), draw(1))
+    # Room for two charts, not three
+    cache = ChartCache(max_mb=2.5 * len(png) / 1024 / 1024)
+
+    assert cache.get(('line', 1), draw(1))[1]['hit'] is False
+    cache.get(('line', 2), draw(2))
+    assert cache.get(('line', 1), draw(1)) == (png, {'hit': True, 'render_ms': 0.0})
+    # Chart 2 is now the least recently used
+    cache.get(('line', 3), draw(3))
+    assert len(cache) == 2
+    assert cache.size <= 2.5 * len(png)
+    assert cache.get(('line', 1), draw(1))[1]['hit'] is True
+    assert cache.get(('line', 2), draw(2))[1]['hit'] is False
+
+    stats = cache.stats()['line']
+    assert stats['hits'] == 2 and stats['misses'] == 4 and stats['evictions'] == 2
+
+
+def test_chart_over_the_cap_is_not_kept():
+    cache = ChartCache(max_mb=0.0001)
+    cache.get(('line', 1), draw(1))
+    assert len(cache) == 0 and cache.size == 0
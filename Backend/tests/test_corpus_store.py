@@ -0,0 +1,51 @@
+import pandas as pd
+
+from corpus_store import CorpusStore, convert_csv
+
+
+def write_csv(path, urls):
+    pd.DataFrame({
+        'president': ['Washington', 'Washington', 'Adams'],
+        'date': ['January 8, 1790', 'December 8, 1790', 'November 22, 1797'],
+        'url': urls,
+        'speech_text': ['Fellow citizens', 'War and peace', ''],
+        'cleaned_speech': ['fellow citizen', 'war peace', None],
+        'sentiment_score': [0.5, -0.25, None],
+    }).to_csv(path, index=False)
+
+
+def test_round_trip(tmp_path):
+    write_csv(tmp_path / 'speeches.csv', ['a', 'b', 'c'])
+    manifest = convert_csv(str(tmp_path / 'speeches.csv'), str(tmp_path / 'store'), chunk_size=2)
+    store = CorpusStore(str(tmp_path / 'store'))
+
+    assert len(store) == manifest['rows'] == 3
+    metadata = store.metadata()
+    assert metadata['doc_id'].tolist() == [0, 1, 2]
+    assert metadata['year'].tolist() == [1790, 1790, 1797]
+    assert metadata['url'].tolist() == ['a', 'b', 'c']
+    assert 'speech_text' not in metadata
+    assert store.text(1) == 'War and peace'
+    assert store.text(2, 'cleaned_speech') == ''
+    assert store.text_slice(1, 4, 7) == 'and'
+    assert list(store.iter_texts('cleaned_speech')) == [(0, 'fellow citizen'), (1, 'war peace'), (2, None)]
+
+
+def test_chunks_with_an_empty_column(tmp_path):
+    # The first chunk has no urls at all
+    write_csv(tmp_path / 'speeches.csv', [None, None, 'c'])
+    convert_csv(str(tmp_path / 'speeches.csv'), str(tmp_path / 'store'), chunk_size=2)
+    assert CorpusStore(str(tmp_path / 'store')).metadata()['url'].tolist()[2] == 'c'
+
+
+def test_data_version(tmp_path):
+    write_csv(tmp_path / 'speeches.csv', ['a', 'b', 'c'])
+    first = convert_csv(str(tmp_path / 'speeches.csv'), str(tmp_path / 'store'), chunk_size=2)
+    # The same data in other chunks: the same version
+    again = convert_csv(str(tmp_path / 'speeches.csv'), str(tmp_path / 'store'))
+    assert again['data_version'] == first['data_version']
+
+    write_csv(tmp_path / 'speeches.csv', ['a', 'b', 'changed'])
+    changed = convert_csv(str(tmp_path / 'speeches.csv'), str(tmp_path / 'store'))
+    assert changed['data_version'] != first['data_version']
+    assert CorpusStore(str(tmp_path / 'store')).data_version == changed['data_version']
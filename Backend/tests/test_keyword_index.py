@@ -0,0 +1,44 @@
+import pytest
+
+from keyword_index import KeywordIndex
+
+TEXTS = [
+    "The United States is at war. An award for the war effort.",
+    "States united against war; the united states, united.",
+    "Peace",
+]
+
+
+def index():
+    return KeywordIndex.build(enumerate(TEXTS))
+
+
+def test_whole_word_counts():
+    keywords = index()
+    # "award" is not "war"
+    assert keywords.counts('war').tolist() == [2, 1, 0]
+    assert keywords.counts('WAR', [1, 2]).tolist() == [1, 0]
+    assert keywords.count('peace') == 1
+    assert keywords.count('wa') == 0
+
+
+def test_phrase_counts():
+    keywords = index()
+    assert keywords.counts('united states').tolist() == [1, 1, 0]
+    # Punctuation between the words doesn't break a phrase
+    assert keywords.count('states united') == 2
+    # Not across the end of one speech and the start of the next
+    assert keywords.count('united peace') == 0
+    assert keywords.count('award war') == 0
+
+
+def test_matches_are_character_spans():
+    keywords = index()
+    spans = keywords.matches('united states', 1)
+    assert [TEXTS[1][start:end] for start, end in spans] == ['united states']
+    assert [TEXTS[0][start:end] for start, end in keywords.matches('war', 0)] == ['war', 'war']
+
+
+def test_unknown_speech():
+    with pytest.raises(KeyError):
+        index().counts('war', [7])
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from query_service import QueryService
+
+
+@pytest.fixture
+def service(tmp_path):
+    pd.DataFrame({
+        'president': ['Washington', 'Washington', 'Adams'],
+        'date': ['January 8, 1790', 'December 8, 1790', 'November 22, 1797'],
+        'url': ['a', 'b', 'c'],
+        'speech_text': ['Fellow citizens', 'War and peace', 'Peace'],
+        'cleaned_speech': ['fellow citizen', 'war peace', 'peace'],
+        'sentiment_score': [0.5, -0.25, 0.1],
+    }).to_csv(tmp_path / 'sotu_speeches_processed.csv', index=False)
+    service = QueryService(str(tmp_path), workers=2, model_workers=1)
+    yield service
+    for executor in (service.executor, service.model_executor, service.reload_executor):
+        executor.shutdown()
+
+
+def blocking(service, name, answer, before_answer=None):
+    """Makes the service's query `name` wait for the returned event, counting its calls."""
+    release, calls = threading.Event(), []
+
+    def query(**params):
+        calls.append(params)
+        release.wait(5)
+        if before_answer is not None:
+            before_answer()
+        return answer
+
+    setattr(service.queries, name, query)
+    return release, calls
+
+
+def test_http_answers_and_cache(service):
+    async def requests():
+        async with TestClient(TestServer(service.app())) as client:
+            first = await client.get('/api/presidents')
+            again = await client.get('/api/presidents')
+            assert first.status == again.status == 200
+            assert await first.json() == await again.json() == ['Adams', 'Washington']
+            assert (first.headers['X-Cache'], again.headers['X-Cache']) == ('miss', 'hit')
+
+            speech = await client.get('/api/speech', params={'doc_id': 1})
+            assert (await speech.json())['url'] == 'b'
+            # Unknown speech, query or action: 404
+            assert (await client.get('/api/speech', params={'doc_id': 99})).status == 404
+            assert (await client.get('/api/nope')).status == 404
+            # Bad or missing parameters: 400
+            assert (await client.get('/api/speech', params={'doc_id': 'x'})).status == 400
+            assert (await client.get('/api/speech', params={'bogus': 1})).status == 400
+            assert (await client.get('/api/speech')).status == 400
+            # Actions only by POST, queries only by GET
+            assert (await client.get('/api/start_sweep', params={'low': 2, 'high': 3})).status == 405
+            assert (await client.post('/api/presidents')).status == 405
+
+            status = await (await client.get('/status')).json()
+            assert status['speeches'] == 3 and status['cache_entries'] == 2
+
+    asyncio.run(requests())
+
+
+def test_identical_queries_are_coalesced(service):
+    release, calls = blocking(service, 'presidents', ['Adams'])
+
+    async def ask():
+        answers = [asyncio.ensure_future(service.answer('presidents', {})) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        release.set()
+        return await asyncio.gather(*answers)
+
+    answers = asyncio.run(ask())
+    assert len(calls) == 1
+    assert sorted(how for _, how in answers) == ['coalesced'] * 4 + ['miss']
+    assert {body for body, _ in answers} == {b'["Adams"]'}
+    assert not service.inflight
+
+
+def test_answer_for_a_replaced_version_is_not_cached(service):
+    def reload():
+        service.queries.data_version = 'newer'
+
+    release, _ = blocking(service, 'presidents', ['Adams'], before_answer=reload)
+    release.set()
+    body, how = asyncio.run(service.answer('presidents', {}))
+    assert (body, how) == (b'["Adams"]', 'miss')
+    assert len(service.cache) == 0
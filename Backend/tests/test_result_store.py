@@ -0,0 +1,34 @@
+from result_store import ResultStore
+
+
+def test_hits_and_misses(tmp_path):
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    with ResultStore(str(tmp_path / 'cache.sqlite')) as store:
+        assert store.map('clean', 'v1', ['a', 'b', 'a'], compute) == ['A', 'B', 'A']
+        # Each distinct text is computed once
+        assert calls == [['a', 'b']]
+
+        assert store.map('clean', 'v1', ['b', 'c'], compute) == ['B', 'C']
+        assert calls[-1] == ['c']
+        # Counted per row: the repeated 'a' was recomputed too, in the first batch
+        assert store.stats['clean'] == {'hits': 1, 'recomputed': 4}
+
+        # Another version or another stage doesn't see those results
+        store.map('clean', 'v2', ['a'], compute)
+        store.map('sentiment', 'v1', ['a'], compute)
+        assert calls[-2:] == [['a'], ['a']]
+
+
+def test_results_persist(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    with ResultStore(path) as store:
+        store.map('clean', 'v1', ['a'], lambda texts: [{'score': len(text)} for text in texts])
+
+    with ResultStore(path) as store:
+        assert store.map('clean', 'v1', ['a'], lambda texts: 1 / 0) == [{'score': 1}]
+        assert store.stats['clean'] == {'hits': 1, 'recomputed': 0}
@@ -0,0 +1,43 @@
+import json
+
+from scraper import ScrapeJournal, resume_crawl
+
+
+def record(n):
+    return {'president': 'Washington', 'date': 'January 8, 1790', 'url': f"https://example.invalid/{n}",
+            'speech_text': f"Speech {n}"}
+
+
+def test_resume_skips_journaled_speeches(tmp_path):
+    journal = ScrapeJournal(str(tmp_path / 'scrape_journal.jsonl'))
+    for n in (1, 3, 9):
+        journal.append(record(n))
+    links = [record(n)['url'] for n in (1, 2, 3, 4)]
+
+    records, pending = resume_crawl(journal, links)
+    # Speech 9 was journaled, but isn't wanted anymore (e.g. --new-only since)
+    assert [r['url'] for r in records] == [links[0], links[2]]
+    assert pending == [links[1], links[3]]
+
+
+def test_resume_after_a_cut_short_line(tmp_path):
+    path = tmp_path / 'scrape_journal.jsonl'
+    journal = ScrapeJournal(str(path))
+    journal.append(record(1))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record(2))[:20])
+
+    records, pending = resume_crawl(journal, [record(n)['url'] for n in (1, 2)])
+    assert records == [record(1)]
+    assert pending == [record(2)['url']]
+
+    # The partial line is gone, so the next append starts a line of its own
+    journal.append(record(2))
+    assert journal.load() == [record(1), record(2)]
+
+
+def test_clear(tmp_path):
+    journal = ScrapeJournal(str(tmp_path / 'scrape_journal.jsonl'))
+    journal.append(record(1))
+    journal.clear()
+    assert journal.load() == []
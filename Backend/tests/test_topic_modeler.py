@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from topic_modeler import TopicModeler
+from similarity_index import SimilarityIndex
+
+WORDS = [f"word{i}" for i in range(60)]
+
+
+def corpus(n, seed):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(80)) for _ in range(n)]
+
+
+@pytest.mark.parametrize('grow_vocabulary', [False, True])
+def test_updates_every_number_of_topics(tmp_path, grow_vocabulary):
+    cache_dir = str(tmp_path)
+    old = corpus(40, seed=1)
+    base = TopicModeler(old, cache_dir=cache_dir)
+    for k in (3, 4):
+        base.model(k)
+
+    grown = TopicModeler(old + corpus(5, seed=2), cache_dir=cache_dir)
+    # The similarity index reads the grown corpus's TF-IDF matrix before any update
+    SimilarityIndex(grown.tfidf_matrix(), list(range(45)))
+
+    lda3, record3 = grown.update_model(3, grow_vocabulary=grow_vocabulary)
+    lda4, record4 = grown.update_model(4, grow_vocabulary=grow_vocabulary)
+    assert record3 is not None and record3['new_documents'] == 5
+    assert record4 is not None and record4['new_documents'] == 5
+    # Both models share the vectors the first update defined
+    assert lda3.components_.shape[1] == lda4.components_.shape[1] == len(grown.vocabulary)
+
+    # Loaded from the cache afterwards, not updated again
+    again = TopicModeler(old + corpus(5, seed=2), cache_dir=cache_dir)
+    assert again.update_model(4)[1] is None
@@ -1,38 +1,576 @@
+"""
+Topic modeling (TF-IDF + LDA) over the cleaned speeches, shared by this script and the app.
+
+The three steps are cached separately, so each only reruns when its own inputs change:
+- vectorizing: the TF-IDF matrix, vocabulary and idf weights of a corpus are computed
+  once and saved as one .npz file, keyed by a hash of the documents and vectorizer settings
+- fitting: every fitted LDA model is saved, keyed by (corpus hash, number of topics,
+  LDA settings); the cache directory is kept under a size limit by evicting the least
+  recently used files
+- presenting: the top words of each topic are read from a (cached) model, so asking for
+  more or fewer words never refits anything
+
+A sweep fits every number of topics in a range in parallel against the one TF-IDF
+matrix, caches the models, and saves perplexity, UMass coherence and fit time per k
+so the app can show a quality curve and load any k instantly.
+
+When speeches are added, update_model() doesn't refit from scratch: it takes the model
+of the largest cached corpus the new one extends, and updates it with online LDA
+(partial_fit) on the new speeches only, keeping the old vocabulary or growing it with
+the new corpus's words. How far each topic moved is measured (Jensen-Shannon divergence
+of its word distribution) and logged to topic_drift.jsonl; past `drift_threshold`, the
+model is refitted on the whole corpus instead.
+
+Run from the Backend directory:
+    python topic_modeler.py --topics 10 --words 10
+    python topic_modeler.py --sweep 3-20 --workers 4
+    python topic_modeler.py --update --topics 10
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+import sklearn
+from joblib import Parallel, delayed
+from scipy import sparse
+from scipy.special import psi, rel_entr
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
 from sklearn.decomposition import LatentDirichletAllocation
 
-print("Loading processed data...")
-try:
-    df = pd.read_csv('sotu_speeches_processed.csv')
-    # Handle any potential missing values in the cleaned text
-    df.dropna(subset=['cleaned_speech'], inplace=True)
-except FileNotFoundError:
-    print("Error: sotu_speeches_processed.csv not found.")
-    print("Please run app.py first to generate the processed data.")
-    exit()
-
-# We need the cleaned speech text for topic modeling
-documents = df['cleaned_speech']
-
-# Step 1: Create the TF-IDF Vectorizer
-# TF-IDF stands for Term Frequency-Inverse Document Frequency.
-# It gives more weight to words that are frequent in one document but rare across all documents.
-print("Creating TF-IDF vectors...")
-vectorizer = TfidfVectorizer(max_df=0.9, min_df=5, stop_words='english')
-tfidf_vectors = vectorizer.fit_transform(documents)
-
-# Step 2: Create and run the LDA Model
-# We'll ask it to find 10 topics. This number is arbitrary and can be tuned.
-num_topics = 10
-print(f"Running LDA to find {num_topics} topics...")
-lda = LatentDirichletAllocation(n_components=num_topics, random_state=42)
-lda.fit(tfidf_vectors)
-
-# Step 3: Display the topics
-print("\n--- Top Words for Each Topic ---")
-feature_names = vectorizer.get_feature_names_out()
-for topic_idx, topic in enumerate(lda.components_):
-    # Get the top 10 words for this topic
-    top_words = [feature_names[i] for i in topic.argsort()[:-11:-1]]
-    print(f"Topic #{topic_idx + 1}: {', '.join(top_words)}")
\ No newline at end of file
+# Imported under another name: `metrics` is a sweep's model quality here
+from instrumentation import metrics as stage_metrics
+
+VECTORIZER_PARAMS = {'max_df': 0.9, 'min_df': 5, 'stop_words': 'english'}
+LDA_PARAMS = {'random_state': 42}
+# Mean Jensen-Shannon divergence (0-1) of the topics past which an update refits instead
+DRIFT_THRESHOLD = 0.1
+DRIFT_LOG = 'topic_drift.jsonl'
+
+
+def _key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _model_key(corpus_hash, num_topics, lda_params):
+    return _key(corpus_hash, num_topics, {**LDA_PARAMS, **lda_params}, sklearn.__version__)
+
+
+def _doc_hash(document):
+    return hashlib.sha256(document.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_vectors(path):
+    """(matrix, vocabulary, idf) from a vectors-*.npz cache file."""
+    with np.load(path, allow_pickle=False) as saved:
+        matrix = sparse.csr_matrix((saved['data'], saved['indices'], saved['indptr']), shape=tuple(saved['shape']))
+        return matrix, saved['vocabulary'], saved['idf']
+
+
+def topic_drift(before, after):
+    """
+    Jensen-Shannon divergence (base 2, 0 = unchanged, 1 = disjoint) between each topic's
+    word distribution before and after an update. `before` may have fewer columns
+    (words added by the update), which count as words it gave no weight.
+    """
+    before = np.hstack([before, np.zeros((before.shape[0], after.shape[1] - before.shape[1]))])
+    p = before / before.sum(axis=1, keepdims=True)
+    q = after / after.sum(axis=1, keepdims=True)
+    m = (p + q) / 2
+    divergence = (rel_entr(p, m).sum(axis=1) + rel_entr(q, m).sum(axis=1)) / (2 * np.log(2))
+    return np.clip(divergence, 0, 1)
+
+
+def umass_coherence(lda, matrix, top_n=10):
+    """
+    Mean UMass coherence of a model's topics: for each topic's top words, how often
+    they occur in the same documents. Closer to 0 is more coherent.
+    """
+    occurs = (matrix > 0).tocsc().astype(np.float64)
+    scores = []
+    for topic in lda.components_:
+        top = topic.argsort()[:-top_n - 1:-1]
+        columns = occurs[:, top]
+        co_docs = (columns.T @ columns).toarray()
+        score = 0.0
+        for i in range(1, len(top)):
+            for j in range(i):
+                score += np.log((co_docs[i, j] + 1) / max(co_docs[j, j], 1))
+        scores.append(score)
+    return float(np.mean(scores))
+
+
+def _fit_and_score(matrix, num_topics, lda_params):
+    """Fits one model of a sweep and measures it (runs in a worker process)."""
+    start = time.perf_counter()
+    lda = LatentDirichletAllocation(n_components=num_topics, **lda_params)
+    lda.fit(matrix)
+    fit_seconds = time.perf_counter() - start
+    metrics = {
+        'perplexity': float(lda.perplexity(matrix)),
+        'coherence': umass_coherence(lda, matrix),
+        'fit_seconds': round(fit_seconds, 3),
+    }
+    return lda, metrics
+
+
+class TopicModeler:
+    """
+    Topic models of one corpus (a list of cleaned speeches), with an on-disk cache in
+    `cache_dir` of at most `max_cache_mb` megabytes.
+    """
+
+    def __init__(self, documents, cache_dir='topic_cache', max_cache_mb=500, vectorizer_params=None):
+        self.documents = list(documents)
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_mb * 1024 * 1024
+        self.vectorizer_params = dict(VECTORIZER_PARAMS if vectorizer_params is None else vectorizer_params)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        for document in self.documents:
+            digest.update(document.encode('utf-8'))
+            digest.update(b'\0')
+        # Identifies the vectorized corpus: the documents and how they are vectorized
+        self.corpus_hash = _key(digest.hexdigest(), self.vectorizer_params, sklearn.__version__)
+        self._matrix = self._vocabulary = self._idf = None
+        self._models = {}
+
+    # --- Cache files ---
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _touch(self, path):
+        # Modification time doubles as "last used", for eviction
+        os.utime(path)
+
+    def _save(self, path, write):
+        """Writes a cache file atomically, then evicts old files until the cache fits."""
+        # Per thread, as models for several numbers of topics may be saved at a time
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = self._path(name)
+            if os.path.isfile(path) and not name.endswith('.tmp'):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            # Only vectors and models are evicted; manifests, sweep results and the drift log are tiny
+            name = os.path.basename(path)
+            if path != keep and name.startswith(('vectors-', 'lda-')):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Evicted by another thread meanwhile
+                    pass
+                total -= size
+
+    # --- Step 1: vectorizing ---
+
+    def _vectorize(self):
+        path = self._path(f"vectors-{self.corpus_hash}.npz")
+        if os.path.exists(path):
+            self._matrix, self._vocabulary, self._idf = _load_vectors(path)
+            self._touch(path)
+            return
+
+        vectorizer = TfidfVectorizer(**self.vectorizer_params)
+        with stage_metrics.stage('vectorize', items=len(self.documents)):
+            matrix = vectorizer.fit_transform(self.documents).tocsr()
+        self._store_vectors(matrix, vectorizer.get_feature_names_out().astype(str), vectorizer.idf_)
+
+    def _store_vectors(self, matrix, vocabulary, idf):
+        self._matrix, self._vocabulary, self._idf = matrix, vocabulary, idf
+        self._save(self._path(f"vectors-{self.corpus_hash}.npz"), lambda f: np.savez(
+            f, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+            shape=np.array(matrix.shape), vocabulary=vocabulary, idf=idf))
+        # Which documents this corpus holds, so a later, larger corpus can find it as a base
+        manifest = json.dumps({'documents': [_doc_hash(d) for d in self.documents]}).encode('utf-8')
+        self._save(self._path(f"corpus-{self.corpus_hash}.json"), lambda f: f.write(manifest))
+
+    @property
+    def matrix(self):
+        """The TF-IDF matrix of the corpus (documents x vocabulary), computed once."""
+        if self._matrix is None:
+            self._vectorize()
+        return self._matrix
+
+    @property
+    def vocabulary(self):
+        if self._vocabulary is None:
+            self._vectorize()
+        return self._vocabulary
+
+    @property
+    def idf(self):
+        if self._idf is None:
+            self._vectorize()
+        return self._idf
+
+    # --- Step 2: fitting ---
+
+    def model_key(self, num_topics, **lda_params):
+        return _model_key(self.corpus_hash, num_topics, lda_params)
+
+    def model(self, num_topics, **lda_params):
+        """The LDA model with `num_topics` topics, from memory, from disk, or freshly fitted."""
+        key = self.model_key(num_topics, **lda_params)
+        if key in self._models:
+            return self._models[key]
+
+        path = self._path(f"lda-{key}.pkl")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                lda = pickle.load(f)
+            self._touch(path)
+        else:
+            lda = LatentDirichletAllocation(n_components=num_topics, **{**LDA_PARAMS, **lda_params})
+            with stage_metrics.stage('lda_fit', items=self.matrix.shape[0]):
+                lda.fit(self.matrix)
+            self._store_model(key, lda)
+        self._models[key] = lda
+        return lda
+
+    def _store_model(self, key, lda):
+        self._save(self._path(f"lda-{key}.pkl"), lambda f: pickle.dump(lda, f, protocol=pickle.HIGHEST_PROTOCOL))
+        self._models[key] = lda
+
+    def is_cached(self, num_topics, **lda_params):
+        """Whether the model is already fitted (in memory or on disk)."""
+        key = self.model_key(num_topics, **lda_params)
+        return key in self._models or os.path.exists(self._path(f"lda-{key}.pkl"))
+
+    # --- Incremental updates ---
+
+    def _find_base(self, num_topics=None, lda_params=None):
+        """
+        The largest cached corpus whose documents are all in this one and that has a
+        model with `num_topics` topics (any vectorized one if None): (corpus hash, its
+        document hashes), or None.
+        """
+        hashes = {_doc_hash(d) for d in self.documents}
+        best = None
+        for name in os.listdir(self.cache_dir):
+            if not (name.startswith('corpus-') and name.endswith('.json')):
+                continue
+            corpus_hash = name[len('corpus-'):-len('.json')]
+            if corpus_hash == self.corpus_hash or not os.path.exists(self._path(f"vectors-{corpus_hash}.npz")):
+                continue
+            if num_topics is not None and not os.path.exists(
+                    self._path(f"lda-{_model_key(corpus_hash, num_topics, lda_params or {})}.pkl")):
+                continue
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                documents = json.load(f)['documents']
+            if set(documents) <= hashes and (best is None or len(documents) > len(best[1])):
+                best = (corpus_hash, documents)
+        return best
+
+    def tfidf_matrix(self):
+        """
+        The TF-IDF matrix, for uses other than topic models (e.g. the similarity index).
+        When this corpus extends a cached one and has no vectors yet, they are computed
+        without caching them: the first update_model() defines this corpus's vectors, in
+        its base model's vocabulary.
+        """
+        if self._matrix is not None or os.path.exists(self._path(f"vectors-{self.corpus_hash}.npz")) \
+                or self._find_base() is None:
+            return self.matrix
+        with stage_metrics.stage('vectorize', items=len(self.documents)):
+            return TfidfVectorizer(**self.vectorizer_params).fit_transform(self.documents).tocsr()
+
+    def update_model(self, num_topics, drift_threshold=DRIFT_THRESHOLD, grow_vocabulary=False, **lda_params):
+        """
+        The model with `num_topics` topics, updated from a cached model of an earlier
+        version of the corpus when there is one (see the module docstring), else fitted.
+        Returns (model, drift record); the record is None when nothing was updated.
+
+        The first update of a corpus defines its vectors (the base vocabulary, or grown
+        with `grow_vocabulary`); updates for other numbers of topics reuse them, so every
+        model of the corpus shares one vocabulary.
+        """
+        base = None
+        if not self.is_cached(num_topics, **lda_params):
+            base = self._find_base(num_topics, lda_params)
+        if base is None:
+            return self.model(num_topics, **lda_params), None
+
+        start = time.perf_counter()
+        base_hash, base_documents = base
+        base_matrix, base_vocabulary, base_idf = _load_vectors(self._path(f"vectors-{base_hash}.npz"))
+        base_rows = {h: i for i, h in enumerate(base_documents)}
+        hashes = [_doc_hash(d) for d in self.documents]
+        new_rows = [i for i, h in enumerate(hashes) if h not in base_rows]
+
+        vectors_exist = os.path.exists(self._path(f"vectors-{self.corpus_hash}.npz"))
+        if vectors_exist:
+            # Defined by an earlier update (for another number of topics)
+            vocabulary, idf, matrix = self.vocabulary, self.idf, self.matrix
+            if len(vocabulary) < len(base_vocabulary) or \
+                    not np.array_equal(vocabulary[:len(base_vocabulary)], base_vocabulary):
+                # Vectorized afresh instead: the base model's words don't line up with them
+                return self.model(num_topics, **lda_params), None
+        elif grow_vocabulary:
+            vocabulary, idf, matrix = self._grown_vectors(base_vocabulary)
+        else:
+            # Same vocabulary and weights: the base rows are reused, only new speeches are vectorized
+            vocabulary, idf = base_vocabulary, base_idf
+            counts = CountVectorizer(vocabulary=vocabulary, **self._counter_params()).transform([self.documents[i] for i in new_rows])
+            new_matrix = normalize(counts.multiply(idf).tocsr())
+            stacked = sparse.vstack([base_matrix, new_matrix]).tocsr()
+            new_positions = {row: len(base_documents) + j for j, row in enumerate(new_rows)}
+            order = [base_rows[h] if h in base_rows else new_positions[i] for i, h in enumerate(hashes)]
+            matrix = stacked[order]
+
+        with open(self._path(f"lda-{_model_key(base_hash, num_topics, lda_params)}.pkl"), 'rb') as f:
+            lda = pickle.load(f)
+        # New words start with only the prior's weight in every topic
+        added = len(vocabulary) - len(base_vocabulary)
+        before = lda.components_.copy()
+        if added:
+            lda.components_ = np.hstack([lda.components_, np.full((num_topics, added), lda.topic_word_prior_)])
+            lda.exp_dirichlet_component_ = np.exp(psi(lda.components_) - psi(lda.components_.sum(axis=1))[:, None])
+            lda.n_features_in_ = len(vocabulary)
+
+        lda.set_params(total_samples=matrix.shape[0])
+        if new_rows:
+            with stage_metrics.stage('lda_update', items=len(new_rows)):
+                lda.partial_fit(matrix[new_rows])
+        drift = topic_drift(before, lda.components_)
+
+        refit = bool(drift.mean() > drift_threshold)
+        if refit:
+            with stage_metrics.stage('lda_fit', items=matrix.shape[0]):
+                lda = LatentDirichletAllocation(n_components=num_topics, **{**LDA_PARAMS, **lda_params}).fit(matrix)
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'base_corpus': base_hash,
+            'corpus': self.corpus_hash,
+            'topics': num_topics,
+            'new_documents': len(new_rows),
+            'added_terms': added,
+            'mean_drift': round(float(drift.mean()), 5),
+            'max_drift': round(float(drift.max()), 5),
+            'refit': refit,
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+
+        if not vectors_exist:
+            self._store_vectors(matrix, vocabulary, idf)
+        self._store_model(self.model_key(num_topics, **lda_params), lda)
+        with open(self._path(DRIFT_LOG), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        return lda, record
+
+    def _counter_params(self):
+        """The vectorizer settings that apply to counting (vocabulary selection is done separately)."""
+        return {k: v for k, v in self.vectorizer_params.items() if k not in ('min_df', 'max_df', 'max_features')}
+
+    def _grown_vectors(self, base_vocabulary):
+        """
+        The base vocabulary plus the words the vectorizer settings select from this whole
+        corpus that it doesn't have yet (existing columns keep their place), with idf
+        weights and the TF-IDF matrix over this corpus, in one counting pass.
+        """
+        counter = CountVectorizer(**self._counter_params())
+        with stage_metrics.stage('vectorize', items=len(self.documents)):
+            counts = counter.fit_transform(self.documents).tocsc()
+        terms = counter.get_feature_names_out()
+        doc_freq = np.diff(counts.indptr)
+
+        # Document-frequency limits, as TfidfVectorizer applies them
+        n_docs = counts.shape[0]
+        min_df, max_df = self.vectorizer_params.get('min_df', 1), self.vectorizer_params.get('max_df', 1.0)
+        min_count = min_df if isinstance(min_df, int) else min_df * n_docs
+        max_count = max_df if isinstance(max_df, int) else max_df * n_docs
+        selected = terms[(doc_freq >= min_count) & (doc_freq <= max_count)]
+        vocabulary = np.concatenate([base_vocabulary, np.setdiff1d(selected, base_vocabulary)]).astype(str)
+
+        # Base words absent from this corpus's counts (e.g. no longer used) get an empty column
+        column = {term: i for i, term in enumerate(terms)}
+        with_empty = sparse.hstack([counts, sparse.csc_matrix((n_docs, 1))]).tocsc()
+        selected_counts = with_empty[:, [column.get(term, len(terms)) for term in vocabulary]]
+        # Smoothed idf, as TfidfVectorizer computes it
+        vocabulary_doc_freq = np.diff(selected_counts.indptr)
+        idf = np.log((1 + n_docs) / (1 + vocabulary_doc_freq)) + 1
+        matrix = normalize(selected_counts.multiply(idf).tocsr())
+        return vocabulary, idf, matrix
+
+    def drift_log(self):
+        """Every update recorded in this cache directory, oldest first."""
+        if not os.path.exists(self._path(DRIFT_LOG)):
+            return []
+        with open(self._path(DRIFT_LOG), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # --- Sweeping the number of topics ---
+
+    def _sweep_path(self, lda_params):
+        return self._path(f"sweep-{_key(self.corpus_hash, {**LDA_PARAMS, **lda_params})}.json")
+
+    def sweep_results(self, **lda_params):
+        """{k: {'perplexity', 'coherence', 'fit_seconds'}} of the sweeps run so far on this corpus."""
+        path = self._sweep_path(lda_params)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return {int(k): metrics for k, metrics in json.load(f).items()}
+
+    def sweep(self, topic_counts, workers=None, **lda_params):
+        """
+        Fits a model for every number of topics in `topic_counts`, spread over `workers`
+        processes (default: all cores) that share the one TF-IDF matrix, and records
+        their metrics. Numbers of topics already swept are skipped. Returns all results.
+        """
+        results = self.sweep_results(**lda_params)
+        todo = [k for k in topic_counts if k not in results or not self.is_cached(k, **lda_params)]
+        if not todo:
+            return results
+        params = {**LDA_PARAMS, **lda_params}
+        # Largest first, so the slowest fits don't end up alone at the end
+        fitted = Parallel(n_jobs=workers or os.cpu_count(), return_as='generator_unordered')(
+            delayed(_fit_and_score)(self.matrix, k, params) for k in sorted(todo, reverse=True))
+        for lda, metrics in fitted:
+            k = lda.n_components
+            # Fitted in a worker process, so the fit time comes with the results
+            stage_metrics.add('lda_fit', metrics['fit_seconds'], items=self.matrix.shape[0])
+            self._store_model(self.model_key(k, **lda_params), lda)
+            results[k] = metrics
+            # Save after every model, so an interrupted sweep keeps what it finished
+            data = json.dumps({str(k): results[k] for k in sorted(results)}, indent=2).encode('utf-8')
+            self._save(self._sweep_path(lda_params), lambda f: f.write(data))
+        return results
+
+    # --- Step 3: presenting ---
+
+    def top_words(self, lda, words_per_topic):
+        """The `words_per_topic` highest-weighted words of each topic of a fitted model."""
+        order = lda.components_.argsort(axis=1)[:, :-words_per_topic - 1:-1]
+        return [[str(self.vocabulary[i]) for i in row] for row in order]
+
+    def topics(self, num_topics, words_per_topic, **lda_params):
+        return self.top_words(self.model(num_topics, **lda_params), words_per_topic)
+
+
+def parse_range(text):
+    """'3-20' -> range(3, 21)"""
+    low, _, high = text.partition('-')
+    return range(int(low), int(high or low) + 1)
+
+
+def load_documents(args):
+    """The cleaned speeches, from the corpus store if one is given, else from the CSV."""
+    if args.store:
+        from corpus_store import CorpusStore
+        return [text for _, text in CorpusStore(args.store).iter_texts('cleaned_speech') if text is not None]
+    try:
+        df = pd.read_csv(args.input)
+        # Handle any potential missing values in the cleaned text
+        df.dropna(subset=['cleaned_speech'], inplace=True)
+    except FileNotFoundError:
+        print(f"Error: {args.input} not found.")
+        print("Please run Analyzer.py first to generate the processed data.")
+        exit()
+    return df['cleaned_speech']
+
+
+def print_topics(modeler, lda, words_per_topic):
+    print("\n--- Top Words for Each Topic ---")
+    for topic_idx, top_words in enumerate(modeler.top_words(lda, words_per_topic)):
+        print(f"Topic #{topic_idx + 1}: {', '.join(top_words)}")
+
+
+def report_metrics(path):
+    print("\nStage timings:")
+    print(stage_metrics.report())
+    if path:
+        stage_metrics.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discover topics in the processed speeches with LDA.")
+    parser.add_argument('--input', default='sotu_speeches_processed.csv')
+    parser.add_argument('--store', help="Read the cleaned speeches from this corpus store instead of --input.")
+    parser.add_argument('--topics', type=int, default=10, help="Number of topics to find.")
+    parser.add_argument('--words', type=int, default=10, help="Top words to show per topic.")
+    parser.add_argument('--sweep', type=parse_range, metavar='LOW-HIGH',
+                        help="Fit every number of topics in the range and report their quality instead.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes for --sweep.")
+    parser.add_argument('--update', action='store_true',
+                        help="Update the model of an earlier, smaller corpus with the new speeches instead of refitting.")
+    parser.add_argument('--grow-vocabulary', action='store_true',
+                        help="With --update, also add the new corpus's words (one pass over every speech).")
+    parser.add_argument('--drift-threshold', type=float, default=DRIFT_THRESHOLD,
+                        help="With --update, refit fully when the mean topic drift exceeds this.")
+    parser.add_argument('--cache-dir', default='topic_cache')
+    parser.add_argument('--metrics', help="Write stage timings and counters here (JSON, or Prometheus for .prom).")
+    args = parser.parse_args()
+
+    print("Loading processed data...")
+    # We need the cleaned speech text for topic modeling
+    with stage_metrics.stage('data_load') as timer:
+        documents = load_documents(args)
+        timer['items'] = len(documents)
+    modeler = TopicModeler(documents, cache_dir=args.cache_dir)
+
+    if args.update:
+        lda, record = modeler.update_model(args.topics, drift_threshold=args.drift_threshold,
+                                           grow_vocabulary=args.grow_vocabulary)
+        if record is None:
+            print("No earlier model to update; using the model of the whole corpus.")
+        else:
+            print(f"Updated with {record['new_documents']} new speeches and {record['added_terms']} new terms "
+                  f"in {record['seconds']}s: mean topic drift {record['mean_drift']:.4f} "
+                  f"(max {record['max_drift']:.4f}){', refitted' if record['refit'] else ''}.")
+        print_topics(modeler, lda, args.words)
+        report_metrics(args.metrics)
+        return
+
+    # Step 1: TF-IDF vectors (cached per corpus)
+    # TF-IDF stands for Term Frequency-Inverse Document Frequency.
+    # It gives more weight to words that are frequent in one document but rare across all documents.
+    print("Creating TF-IDF vectors...")
+    matrix = modeler.matrix
+    print(f"  {matrix.shape[0]} documents, {matrix.shape[1]} terms")
+
+    if args.sweep:
+        print(f"Sweeping {args.sweep.start}-{args.sweep.stop - 1} topics on {args.workers} workers...")
+        results = modeler.sweep(args.sweep, workers=args.workers)
+        print(f"\n{'topics':>6} {'perplexity':>12} {'coherence':>10} {'fit time':>9}")
+        for k in args.sweep:
+            metrics = results[k]
+            print(f"{k:>6} {metrics['perplexity']:>12.1f} {metrics['coherence']:>10.3f} {metrics['fit_seconds']:>8.2f}s")
+        report_metrics(args.metrics)
+        return
+
+    # Step 2: The LDA model (cached per corpus and number of topics)
+    cached = modeler.is_cached(args.topics)
+    print(f"{'Loading' if cached else 'Running'} LDA to find {args.topics} topics...")
+    lda = modeler.model(args.topics)
+
+    # Step 3: Display the topics
+    print_topics(modeler, lda, args.words)
+    report_metrics(args.metrics)
+
+
+if __name__ == '__main__':
+    main()
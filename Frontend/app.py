@@ -2,11 +2,29 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
-import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
+import os
+import sys
+import json
+from bisect import bisect_left, bisect_right
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend')
+sys.path.insert(0, BACKEND_DIR)
+import requests
+from queries import CorpusQueries
+from query_client import ServiceClient
+from instrumentation import metrics
+from chart_cache import ChartCache
+
+# Where Analyzer.py writes its output: the Backend directory, unless SOTU_DATA_DIR says otherwise
+DATA_DIR = os.environ.get('SOTU_DATA_DIR', BACKEND_DIR)
+# A running query_service.py to ask instead, shared by every dashboard (e.g. http://127.0.0.1:8765)
+SERVICE_URL = os.environ.get('SOTU_SERVICE_URL')
+# Range of the number-of-topics slider, and of the background sweep
+MIN_TOPICS, MAX_TOPICS = 3, 20
+# Memory cap of the rendered-chart cache shared by all sessions
+CHART_CACHE_MB = 64
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -16,53 +34,188 @@ st.set_page_config(
 )
 
 
-# --- Caching Data Loading ---
-@st.cache_data
-def load_data():
-    """Loads the processed SOTU speeches data."""
+# --- Queries ---
+# The corpus, indexes and topic models are held by the query service, or loaded here once
+# (see queries.py); both answer the same queries with plain lists and records
+@st.cache_resource
+def get_backend():
+    """The query service client, or the corpus loaded in-process (None when there is no processed data)."""
+    if SERVICE_URL:
+        return ServiceClient(SERVICE_URL)
     try:
-        df = pd.read_csv('C:\\Python Projects\\Political Narrative Dynamics Engine\\Backend\\sotu_speeches_processed.csv')
-        df['date'] = pd.to_datetime(df['date'])
-        df['year'] = df['date'].dt.year
-        return df
+        return CorpusQueries(DATA_DIR)
     except FileNotFoundError:
-        st.error("Error: `sotu_speeches_processed.csv` not found.")
-        st.info("Please make sure the file is in the same directory as app.py, or update the path.")
         return None
 
 
-# --- Highlighting Function---
-def highlight_keyword(text, keyword):
-    if not keyword.strip():
-        return text
-    escaped_keyword = re.escape(keyword)
-    highlighted_text = re.sub(
-        f'({escaped_keyword})', r'<mark>\1</mark>', text, flags=re.IGNORECASE
+@st.cache_data
+def speech_titles(data_version):
+    """'President, Month DD, YYYY' for every speech, by doc_id."""
+    return dict(get_backend().titles())
+
+
+# --- Speech Viewer ---
+# A speech is split into pages of whole paragraphs once, and only the page on screen is
+# read from the store and highlighted, at the offsets the keyword index found
+@st.cache_data(max_entries=512)
+def speech_pages(data_version, doc_id):
+    """[start, end] character offsets of the speech's pages."""
+    return get_backend().pages(doc_id)
+
+
+@st.cache_data(max_entries=512)
+def keyword_matches(data_version, doc_id, keyword):
+    """[start, end] character offsets of every occurrence of `keyword` in the speech."""
+    return get_backend().matches(keyword, doc_id)
+
+
+def highlight_keyword(text, offset, matches, current=None):
+    """Marks the matches (speech offsets) in `text`, a page starting at `offset`; match number `current` stands out."""
+    parts, last = [], 0
+    for number, (start, end) in matches:
+        start, end = start - offset, end - offset
+        style = ' style="background-color: orange;"' if number == current else ''
+        parts.append(text[last:start])
+        parts.append(f'<mark{style}>{text[start:end]}</mark>')
+        last = end
+    parts.append(text[last:])
+    return ''.join(parts).replace('\n', '<br>')
+
+
+def viewer_state(doc_id, keyword):
+    """The viewer's page and current match, kept in the session and reset for another speech or keyword."""
+    viewer = st.session_state.get('viewer')
+    if viewer is None or viewer['doc_id'] != doc_id or viewer['keyword'] != keyword:
+        viewer = st.session_state['viewer'] = {'doc_id': doc_id, 'keyword': keyword, 'page': 0, 'match': None}
+    return viewer
+
+
+def turn_page(viewer, step, n_pages):
+    viewer['page'] = min(max(viewer['page'] + step, 0), n_pages - 1)
+    viewer['match'] = None
+
+
+def jump_to_match(viewer, step, match_starts, page_starts):
+    """Moves to the next (step 1) or previous (-1) match, from the current one or page, and to its page."""
+    if viewer['match'] is None:
+        # From the current page: its first match, or the last one before it
+        first = bisect_left(match_starts, page_starts[viewer['page']])
+        match = first if step > 0 else first - 1
+    else:
+        match = viewer['match'] + step
+    viewer['match'] = match % len(match_starts)
+    viewer['page'] = bisect_right(page_starts, match_starts[viewer['match']]) - 1
+
+
+def show_speech(doc_id, keyword):
+    """Shows one page of the speech, with page and keyword-match navigation."""
+    pages = speech_pages(data_version, doc_id)
+    page_starts = [start for start, _ in pages]
+    matches = keyword_matches(data_version, doc_id, keyword)
+    match_starts = [start for start, _ in matches]
+    viewer = viewer_state(doc_id, keyword)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.button("◀ Previous page", on_click=turn_page, args=(viewer, -1, len(pages)),
+                disabled=viewer['page'] == 0, key="viewer_previous_page")
+    col2.button("Next page ▶", on_click=turn_page, args=(viewer, 1, len(pages)),
+                disabled=viewer['page'] == len(pages) - 1, key="viewer_next_page")
+    col3.button(f"◀ Previous '{keyword}'", on_click=jump_to_match, args=(viewer, -1, match_starts, page_starts),
+                disabled=not matches, key="viewer_previous_match")
+    col4.button(f"Next '{keyword}' ▶", on_click=jump_to_match, args=(viewer, 1, match_starts, page_starts),
+                disabled=not matches, key="viewer_next_match")
+
+    start, end = pages[viewer['page']]
+    lo, hi = bisect_left(match_starts, start), bisect_left(match_starts, end)
+    page_text = highlight_keyword(backend.page_text(doc_id, start, end), start,
+                                  zip(range(lo, hi), matches[lo:hi]), viewer['match'])
+    position = f"match {viewer['match'] + 1} of {len(matches)}" if viewer['match'] is not None \
+        else f"{len(matches)} matches of '{keyword}'"
+    st.caption(f"Page {viewer['page'] + 1} of {len(pages)} · {position}")
+    st.markdown(
+        f'<div style="border: 1px solid #e6e6e6; border-radius: 5px; padding: 10px; height: 300px; overflow-y: scroll;">{page_text}</div>',
+        unsafe_allow_html=True
     )
-    return highlighted_text
 
 
-#Function to perform Topic Modeling
-@st.cache_data
-def perform_topic_modeling(data, num_topics, words_per_topic):
-    """Performs LDA Topic Modeling and returns the topics."""
-    documents = data['cleaned_speech'].dropna()
+# --- Charts ---
+# Each chart is rendered once per (chart, president, keyword, data version), its figure
+# closed, and the PNG served from a bounded LRU afterwards
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache(max_mb=CHART_CACHE_MB)
+
+
+def show_chart(key, draw):
+    """Displays chart `key` from the chart cache, drawing it with `draw()` (returning a figure) on a miss."""
+    png, info = get_chart_cache().get(key, draw)
+    if info['hit']:
+        metrics.count('chart_cache_hits')
+    else:
+        metrics.add('chart_render', info['render_ms'] / 1000, items=1)
+    st.image(png)
+    stats = get_chart_cache().stats()[key[0]]
+    status = "Cached" if info['hit'] else f"Rendered in {info['render_ms']:.0f} ms"
+    st.caption(f"{status} ({stats['hits']} cache hits of {stats['hits'] + stats['misses']} views of this chart)")
+
+
+def draw_sentiment_over_time(president_df, president):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.lineplot(data=president_df, x='year', y='sentiment_score', ax=ax, marker='o', color='royalblue')
+    ax.set_title(f"Sentiment of SOTU Speeches by {president}")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Sentiment Score (VADER Compound)")
+    ax.grid(True, linestyle='--', alpha=0.6)
+    ax.tick_params(axis='x', labelrotation=45)
+    return fig
+
+
+def draw_keyword_over_time(president_df, president, keyword):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.lineplot(data=president_df, x='year', y='keyword_freq', ax=ax, marker='o', color='firebrick')
+    ax.set_title(f"Usage of '{keyword}' by {president}")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Keyword Count")
+    ax.grid(True, linestyle='--', alpha=0.6)
+    ax.tick_params(axis='x', labelrotation=45)
+    return fig
 
-    # Create TF-IDF vectors
-    vectorizer = TfidfVectorizer(max_df=0.9, min_df=5, stop_words='english')
-    tfidf_vectors = vectorizer.fit_transform(documents)
 
-    # Run LDA
-    lda = LatentDirichletAllocation(n_components=num_topics, random_state=42)
-    lda.fit(tfidf_vectors)
+def draw_by_president(values, xlabel, color):
+    fig = Figure(figsize=(8, max(6, len(values) * 0.25)))
+    ax = fig.subplots()
+    sns.barplot(x=values, y=values.index, ax=ax, color=color)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("")
+    ax.grid(True, axis='x', linestyle='--', alpha=0.6)
+    return fig
 
-    # Get the topic words
-    feature_names = vectorizer.get_feature_names_out()
-    topics = []
-    for topic_idx, topic in enumerate(lda.components_):
-        top_words = [feature_names[i] for i in topic.argsort()[:-words_per_topic - 1:-1]]
-        topics.append(f"**Topic {topic_idx + 1}:** {', '.join(top_words)}")
-    return topics
+
+def draw_by_decade(by_decade, keyword):
+    fig = Figure(figsize=(16, 5))
+    ax1, ax2 = fig.subplots(1, 2)
+    sns.lineplot(x=by_decade.index, y=by_decade['score_mean'], ax=ax1, marker='o', color='royalblue')
+    ax1.set_xlabel("Decade")
+    ax1.set_ylabel("Mean Sentiment Score")
+    ax1.grid(True, linestyle='--', alpha=0.6)
+    sns.lineplot(x=by_decade.index, y=by_decade['keyword_rate'], ax=ax2, marker='o', color='firebrick')
+    ax2.set_xlabel("Decade")
+    ax2.set_ylabel(f"'{keyword}' per 10,000 Words")
+    ax2.grid(True, linestyle='--', alpha=0.6)
+    return fig
+
+
+# --- Topic Modeling ---
+# The TF-IDF matrix and fitted models are cached on disk by topic_modeler.py, and each
+# model is kept in memory once loaded, so the words-per-topic slider never refits it
+def perform_topic_modeling(num_topics, words_per_topic):
+    """Returns the topics of the (cached) LDA model, as markdown lines, and its last update."""
+    result = backend.topics(num_topics, words_per_topic)
+    topics = [f"**Topic {topic_idx + 1}:** {', '.join(top_words)}"
+              for topic_idx, top_words in enumerate(result['topics'])]
+    return topics, result['update']
 
 
 # --- Main App ---
@@ -71,47 +224,47 @@ st.markdown(
     "Analyze sentiment, keyword usage, and underlying topics in US Presidential State of the Union addresses."
 )
 
-df = load_data()
+backend = get_backend()
+data_version = None
+if backend is None:
+    st.error("Error: `sotu_speeches_processed.csv` not found.")
+    st.info("Please run Analyzer.py first, or set SOTU_DATA_DIR to where it writes its output "
+            "(or SOTU_SERVICE_URL to a running query service).")
+else:
+    try:
+        data_version = backend.info()['data_version']
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error: the query service at {SERVICE_URL} is not answering ({e}).")
+        st.info("Please start it with `python query_service.py --data-dir <data directory>` in Backend/.")
 
-if df is not None:
+if data_version is not None:
     # --- Sidebar for User Inputs (no changes) ---
     st.sidebar.header("Analyzer Controls")
-    president_list = sorted(df['president'].unique())
+    president_list = backend.presidents()
     selected_president = st.sidebar.selectbox("Select a President:", options=president_list)
     keyword = st.sidebar.text_input("Enter a keyword to track:", value="economy").lower()
 
     # --- Create Tabs for Different Analyses ---
-    tab1, tab2 = st.tabs(["Presidential Analysis", "Overall Topic Modeling"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Presidential Analysis", "Overall Topic Modeling", "Similar Speeches",
+                                      "Compare Presidents"])
 
     # --- TAB 1: PRESIDENTIAL ANALYSIS (Existing Code) ---
     with tab1:
         st.header(f"Analysis for {selected_president}")
 
-        # Filter data and calculate keyword frequency
-        president_df = df[df['president'] == selected_president].copy()
-
-
-        def count_keyword(text, key):
-            return text.lower().count(key) if isinstance(text, str) else 0
-
-
-        president_df['keyword_freq'] = president_df['speech_text'].apply(lambda text: count_keyword(text, keyword))
+        # The speech list, precomputed per president, with keyword counts from the index
+        president_df = pd.DataFrame(backend.speeches(selected_president))
 
         if president_df.empty:
             st.warning(f"No data available for {selected_president}.")
         else:
+            president_df['keyword_freq'] = backend.keyword_counts(keyword, president_df['doc_id'].tolist())
             col1, col2 = st.columns(2)
             # Plot 1: Sentiment Over Time
             with col1:
                 st.subheader("Sentiment Over Time")
-                fig1, ax1 = plt.subplots(figsize=(10, 6))
-                sns.lineplot(data=president_df, x='year', y='sentiment_score', ax=ax1, marker='o', color='royalblue')
-                ax1.set_title(f"Sentiment of SOTU Speeches by {selected_president}")
-                ax1.set_xlabel("Year")
-                ax1.set_ylabel("Sentiment Score (VADER Compound)")
-                ax1.grid(True, linestyle='--', alpha=0.6)
-                plt.xticks(rotation=45)
-                st.pyplot(fig1)
+                show_chart(('sentiment_over_time', selected_president, None, data_version),
+                           lambda: draw_sentiment_over_time(president_df, selected_president))
 
             # Plot 2: Keyword Frequency Over Time
             with col2:
@@ -119,32 +272,29 @@ if df is not None:
                 if president_df['keyword_freq'].sum() == 0:
                     st.warning(f"The keyword '{keyword}' was not found in any speeches by {selected_president}.")
                 else:
-                    fig2, ax2 = plt.subplots(figsize=(10, 6))
-                    sns.lineplot(data=president_df, x='year', y='keyword_freq', ax=ax2, marker='o', color='firebrick')
-                    ax2.set_title(f"Usage of '{keyword}' by {selected_president}")
-                    ax2.set_xlabel("Year")
-                    ax2.set_ylabel("Keyword Count")
-                    ax2.grid(True, linestyle='--', alpha=0.6)
-                    plt.xticks(rotation=45)
-                    st.pyplot(fig2)
+                    show_chart(('keyword_over_time', selected_president, keyword, data_version),
+                               lambda: draw_keyword_over_time(president_df, selected_president, keyword))
 
             # Display Raw Data and Individual Speeches
             with st.expander("View Speech Data and Read Individual Speeches"):
                 st.dataframe(president_df[['year', 'sentiment_score', 'keyword_freq', 'url']])
                 st.subheader("Read a Specific Speech")
-                speech_options = president_df['date'].dt.strftime('%B %d, %Y').tolist()
-                selected_speech_str = st.selectbox("Choose a speech to display its text:", options=speech_options,
-                                                   key="speech_select")
-                if selected_speech_str:
-                    selected_date = pd.to_datetime(selected_speech_str)
-                    selected_speech_row = president_df[president_df['date'] == selected_date].iloc[0]
-                    speech_text = selected_speech_row['speech_text']
-                    highlighted_text = highlight_keyword(speech_text, keyword)
-                    st.markdown(f"**Displaying speech from: {selected_speech_row['date'].strftime('%B %d, %Y')}**")
-                    st.markdown(
-                        f'<div style="border: 1px solid #e6e6e6; border-radius: 5px; padding: 10px; height: 300px; overflow-y: scroll;">{highlighted_text}</div>',
-                        unsafe_allow_html=True
-                    )
+                speech_labels = dict(zip(president_df['doc_id'], president_df['label']))
+                selected_doc_id = st.selectbox("Choose a speech to display its text:", options=list(speech_labels),
+                                               format_func=speech_labels.get, key="speech_select")
+                if selected_doc_id is not None:
+                    selected_speech_row = backend.speech(selected_doc_id)
+                    st.markdown(f"**Displaying speech from: {speech_labels[selected_doc_id]}**")
+                    show_speech(selected_doc_id, keyword)
+
+                    # Sentiment over the course of the speech, precomputed by Analyzer.py
+                    trajectory = selected_speech_row.get('sentiment_trajectory')
+                    if isinstance(trajectory, str):
+                        st.markdown("**Sentiment over the course of this speech**")
+                        trajectory_df = pd.DataFrame({'Sentiment (VADER compound)': json.loads(trajectory)})
+                        trajectory_df.index = range(1, len(trajectory_df) + 1)
+                        trajectory_df.index.name = "Part of speech"
+                        st.line_chart(trajectory_df)
 
     # --- TAB 2: TOPIC MODELING ---
     with tab2:
@@ -157,15 +307,123 @@ if df is not None:
 
         # User controls for topic modeling
         st.subheader("Topic Model Controls")
-        num_topics = st.slider("Select Number of Topics to Discover:", min_value=3, max_value=20, value=10, step=1)
+        num_topics = st.slider("Select Number of Topics to Discover:", min_value=MIN_TOPICS, max_value=MAX_TOPICS,
+                               value=10, step=1)
         words_per_topic = st.slider("Select Number of Words per Topic:", min_value=5, max_value=15, value=10, step=1)
 
+        # Model quality across the number of topics, from the sweeps run so far
+        with st.expander("Compare numbers of topics"):
+            sweep = backend.sweep_results()
+            swept = [record['topics'] for record in sweep if MIN_TOPICS <= record['topics'] <= MAX_TOPICS]
+            if sweep:
+                quality_df = pd.DataFrame(sweep).set_index('topics')
+                quality_df.index.name = "Number of topics"
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**Coherence (UMass, higher is better)**")
+                    st.line_chart(quality_df['coherence'])
+                with col2:
+                    st.markdown("**Perplexity (lower is better)**")
+                    st.line_chart(quality_df['perplexity'])
+                st.caption(f"Precomputed: {len(swept)} of {MAX_TOPICS - MIN_TOPICS + 1} topic counts; "
+                           f"these load instantly. Total fit time {quality_df['fit_seconds'].sum():.1f}s.")
+            if backend.sweep_running():
+                st.info("Fitting every number of topics in the background...")
+                st.button("Refresh", key="refresh_sweep")
+            elif len(swept) < MAX_TOPICS - MIN_TOPICS + 1:
+                if st.button(f"Precompute {MIN_TOPICS}-{MAX_TOPICS} topics in the background", key="start_sweep"):
+                    backend.start_sweep(MIN_TOPICS, MAX_TOPICS)
+                    st.rerun()
+
         # Button to run the analysis
         if st.button("Run Topic Analysis", key="run_topics"):
             with st.spinner("Analyzing all speeches... This may take a moment on the first run."):
                 # Call our cached function
-                topics = perform_topic_modeling(df, num_topics, words_per_topic)
+                topics, update = perform_topic_modeling(num_topics, words_per_topic)
 
                 st.subheader("Discovered Topics")
                 for topic in topics:
-                    st.markdown(f"* {topic}")
\ No newline at end of file
+                    st.markdown(f"* {topic}")
+
+                if update:
+                    st.caption(f"Updated with {update['new_documents']} new speeches; mean topic drift "
+                               f"{update['mean_drift']:.4f}{' (refitted)' if update['refit'] else ''}.")
+
+    # --- TAB 3: SIMILAR SPEECHES ---
+    with tab3:
+        st.header("Find Speeches Like This One")
+        st.markdown("""
+        Pick any address to find the most similar ones across presidents and eras, by the words they
+        use (cosine similarity of their TF-IDF vectors), along with any near-duplicate texts.
+        """)
+
+        speech_labels = speech_titles(data_version)
+        indexed = backend.similarity_doc_ids()
+        selected_doc = st.selectbox("Choose a speech:", options=indexed, format_func=speech_labels.get,
+                                    key="similar_select")
+        num_similar = st.slider("Number of similar speeches:", min_value=3, max_value=20, value=10, step=1)
+
+        if selected_doc is not None:
+            similar_df = pd.DataFrame(backend.similar(selected_doc, num_similar),
+                                      columns=['doc_id', 'similarity', 'president', 'year', 'url'])
+            st.dataframe(similar_df.drop(columns='doc_id'))
+
+            duplicates = backend.duplicates(selected_doc)
+            if duplicates:
+                st.warning("Near-duplicate texts: " + "; ".join(
+                    f"{speech_labels[doc_id]} (~{similarity:.0%} shared passages)" for doc_id, similarity in duplicates))
+
+    # --- TAB 4: COMPARE PRESIDENTS ---
+    with tab4:
+        st.header("Comparing Presidents and Eras")
+        st.markdown(f"""
+        Average sentiment and use of '{keyword}' (per 10,000 words, so that long and short addresses
+        count alike) for every president and decade, from aggregates precomputed by Analyzer.py.
+        """)
+
+        by_president = pd.DataFrame(backend.stats('president')).set_index('president')
+        by_president = by_president.loc[backend.presidents(chronological=True)]
+        by_president['keyword_rate'] = pd.DataFrame(backend.term_rates(keyword, 'president')).set_index('president')['rate']
+        by_decade = pd.DataFrame(backend.stats('decade')).set_index('decade')
+        by_decade['keyword_rate'] = pd.DataFrame(backend.term_rates(keyword, 'decade')).set_index('decade')['rate']
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Average Sentiment by President")
+            show_chart(('sentiment_by_president', None, None, data_version),
+                       lambda: draw_by_president(by_president['score_mean'],
+                                                 "Mean Sentiment Score (VADER Compound)", 'royalblue'))
+        with col2:
+            st.subheader(f"Use of '{keyword}' by President")
+            show_chart(('keyword_by_president', None, keyword, data_version),
+                       lambda: draw_by_president(by_president['keyword_rate'].fillna(0),
+                                                 "Occurrences per 10,000 Words", 'firebrick'))
+
+        st.subheader("By Decade")
+        show_chart(('by_decade', None, keyword, data_version), lambda: draw_by_decade(by_decade, keyword))
+
+        with st.expander("View the aggregates"):
+            st.dataframe(by_president)
+
+    # Chart cache use so far, across sessions
+    with st.sidebar.expander("Chart cache"):
+        chart_cache = get_chart_cache()
+        st.caption(f"{len(chart_cache)} charts, {chart_cache.size / 1024 / 1024:.1f} of {CHART_CACHE_MB} MB")
+        st.dataframe(pd.DataFrame.from_dict(chart_cache.stats(), orient='index').round(2))
+
+    # The shared query service's response cache
+    if isinstance(backend, ServiceClient):
+        with st.sidebar.expander("Query service"):
+            service = backend.status()
+            st.caption(f"{SERVICE_URL}: {service['cache_entries']} cached answers, "
+                       f"{service['cache_bytes'] / 1024 / 1024:.1f} of {service['cache_max_bytes'] / 1024 / 1024:.0f} MB")
+            st.dataframe(pd.Series({name: service[name] for name in ('cache_hits', 'cache_misses', 'coalesced',
+                                                                     'cache_evictions')}, name="count"))
+
+    # Stage timings of this server process (see instrumentation.py)
+    with st.sidebar.expander("Pipeline metrics"):
+        stages = metrics.to_dict()['stages']
+        if stages:
+            st.dataframe(pd.DataFrame.from_dict(stages, orient='index').round(3))
+        st.download_button("Download (Prometheus format)", metrics.to_prometheus(), file_name="sotu_app.prom",
+                           key="download_metrics")
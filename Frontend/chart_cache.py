@@ -0,0 +1,64 @@
+"""
+Rendered-chart cache for the Streamlit app.
+
+Charts are drawn once per key (chart type, president, keyword, data version) on a
+standalone matplotlib Figure and rendered to PNG bytes. Nothing goes through pyplot, so
+no figure is registered in its global state: reruns and concurrent sessions don't pile up
+open figures in the long-running server process, nor draw on each other's. The PNGs are
+kept in an LRU bounded by total size; render time and hits are tracked per chart type.
+"""
+import io
+import threading
+import time
+
+from byte_lru import ByteLRU
+
+
+class ChartCache:
+    """LRU of rendered charts (PNG bytes), holding at most `max_mb` megabytes; shared by all sessions."""
+
+    def __init__(self, max_mb=64, dpi=100):
+        self.dpi = dpi
+        self._charts = ByteLRU(max_mb * 1024 * 1024)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, draw):
+        """
+        The PNG of the chart `key`, whose first element is the chart type; `draw()` makes its
+        matplotlib Figure (not a pyplot one) on a miss. Returns (png, info), info being {'hit', 'render_ms'}.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(key[0], {'hits': 0, 'misses': 0, 'render_ms': 0.0, 'evictions': 0})
+            png = self._charts.get(key)
+            if png is not None:
+                stats['hits'] += 1
+                return png, {'hit': True, 'render_ms': 0.0}
+
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        draw().savefig(buffer, format='png', dpi=self.dpi, bbox_inches='tight')
+        png = buffer.getvalue()
+        render_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            stats['misses'] += 1
+            stats['render_ms'] += render_ms
+            for old_key in self._charts.put(key, png):
+                self._stats[old_key[0]]['evictions'] += 1
+        return png, {'hit': False, 'render_ms': render_ms}
+
+    @property
+    def size(self):
+        """Total bytes of the cached PNGs."""
+        return self._charts.size
+
+    def __len__(self):
+        return len(self._charts)
+
+    def stats(self):
+        """Per chart type: hits, misses, hit rate, mean render time (ms) and evictions."""
+        with self._lock:
+            return {chart: {**s, 'hit_rate': s['hits'] / max(s['hits'] + s['misses'], 1),
+                            'render_ms': s['render_ms'] / max(s['misses'], 1)}
+                    for chart, s in self._stats.items()}